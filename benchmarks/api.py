@@ -0,0 +1,166 @@
+"""Local load test for the headless JSON API in ``core.api``.
+
+Starts ``python -m core.api`` in its own process (pinned to one CPU where
+the platform allows it), then drives it from several client processes over
+keep-alive connections with a mix of top-N, food, search and filter
+requests. Reports throughput, latency percentiles, status codes and the
+server's cache hit ratio.
+
+    python -m benchmarks.api                          # 10 s, 4 clients
+    python -m benchmarks.api --duration 30 --clients 8 --min-rps 2000
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def request_mix(nutrients, codes, seed=0):
+    """A shuffled list of request targets, roughly as other services use the API."""
+    rng = random.Random(seed)
+    words = ["milk", "brazil nuts", "spinach", "salmon", "yogurt", "beans", "oats", "chese"]
+    targets = []
+    for nutrient in nutrients:
+        targets += ["/api/top?" + urlencode({"nutrient": nutrient, "n": n}) for n in (5, 10, 25)]
+    targets += [f"/api/foods/{code}" for code in codes]
+    targets += ["/api/search?" + urlencode({"q": word}) for word in words]
+    targets += ["/api/filter?" + urlencode({"ge": f"{nutrient}:{cut}"})
+                for nutrient in nutrients if nutrient.endswith("PDV") for cut in (10, 20)]
+    rng.shuffle(targets)
+    return targets
+
+
+def _get(conn, target, headers):
+    conn.request("GET", target, headers=headers)
+    response = conn.getresponse()
+    body = response.read()
+    return response.status, response.getheader("ETag"), body
+
+
+def _client(port, targets, duration, revalidate, seed):
+    """Hammer the API until ``duration`` elapses; return status counts and latencies."""
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    etags = {}
+    latencies = []
+    statuses = {}
+    deadline = time.perf_counter() + duration
+    while True:
+        start = time.perf_counter()
+        if start >= deadline:
+            break
+        target = rng.choice(targets)
+        headers = {"Accept-Encoding": "gzip"}
+        if target in etags and rng.random() < revalidate:
+            headers["If-None-Match"] = etags[target]
+        status, etag, _ = _get(conn, target, headers)
+        latencies.append(time.perf_counter() - start)
+        statuses[status] = statuses.get(status, 0) + 1
+        if etag:
+            etags[target] = etag
+    conn.close()
+    return statuses, latencies
+
+
+def _wait_ready(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            status, _, body = _get(conn, "/api/nutrients", {})
+            conn.close()
+            if status == 200:
+                return json.loads(body)
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("API server did not start")
+
+
+def _stats(port):
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    stats = json.loads(_get(conn, "/api/stats", {})[2])
+    conn.close()
+    return stats
+
+
+def _percentile(values, q):
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def run(duration=10, clients=4, port=8765, revalidate=0.3, server_cpu=0):
+    server = subprocess.Popen([sys.executable, "-m", "core.api", "--port", str(port)], cwd=ROOT,
+                              stdout=subprocess.DEVNULL)
+    try:
+        if hasattr(os, "sched_setaffinity") and server_cpu is not None:
+            os.sched_setaffinity(server.pid, {server_cpu})
+        nutrients = _wait_ready(port)["nutrients"]
+
+        from core.dataset import load_nutrients
+
+        codes = load_nutrients().cleaned["Food code"].tolist()[:50]
+        targets = request_mix(nutrients, codes)
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(clients) as pool:
+            results = pool.starmap(_client, [(port, targets, duration, revalidate, seed)
+                                             for seed in range(clients)])
+        stats = _stats(port)
+    finally:
+        server.terminate()
+        server.wait()
+
+    statuses = {}
+    latencies = []
+    for counts, client_latencies in results:
+        for status, n in counts.items():
+            statuses[status] = statuses.get(status, 0) + n
+        latencies += client_latencies
+    latencies.sort()
+    return {
+        "duration_s": duration,
+        "clients": clients,
+        "distinct_targets": len(targets),
+        "requests": len(latencies),
+        "requests_per_s": round(len(latencies) / duration),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies) * 1000, 3),
+            "p50": round(_percentile(latencies, 0.50) * 1000, 3),
+            "p95": round(_percentile(latencies, 0.95) * 1000, 3),
+            "p99": round(_percentile(latencies, 0.99) * 1000, 3),
+        },
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+        "server_cache": stats,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=10, help="seconds to run")
+    parser.add_argument("--clients", type=int, default=4, help="client processes")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--revalidate", type=float, default=0.3,
+                        help="share of repeat requests sent with If-None-Match")
+    parser.add_argument("--min-rps", type=float, help="exit 1 below this throughput")
+    args = parser.parse_args(argv)
+
+    result = run(args.duration, args.clients, args.port, args.revalidate)
+    print(json.dumps(result, indent=2))
+    if args.min_rps and result["requests_per_s"] < args.min_rps:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
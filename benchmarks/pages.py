@@ -0,0 +1,259 @@
+"""Offline render benchmarks for every page registered in ``streamlit_app.py``.
+
+Each page is run headless with Streamlit's ``AppTest`` in a fresh process, so
+the first run is a true cold start (imports, dataset load, image cache fill).
+Warm runs reuse that process. For every page this records script-run latency,
+peak Python allocations, peak RSS and the bytes of dataframe and image
+payloads the page emits, plus the latency of its widget interactions.
+
+    python -m benchmarks.pages                        # print results
+    python -m benchmarks.pages -o benchmarks/baseline.json
+    python -m benchmarks.pages --compare benchmarks/baseline.json
+"""
+
+import argparse
+import ast
+import json
+import multiprocessing
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+APP = ROOT / "streamlit_app.py"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# (widget type, label, value) applied one after another, each timed
+INTERACTIONS = {
+    "views/project1.py": [
+        ("selectbox", "Nutrient:", "Selenium (mcg)"),
+        ("number_input", "Number of foods:", 10),
+        ("selectbox", "Nutrient:", "Magnesium PDV"),
+        ("number_input", "Number of foods:", 3),
+        ("selectbox", "Daily Value profile:", "child"),
+    ],
+}
+
+
+def registered_pages(app=APP):
+    """``(script, title)`` for every ``st.Page`` call in the app entry point."""
+    pages = []
+    for node in ast.walk(ast.parse(app.read_text())):
+        if isinstance(node, ast.Call) and getattr(node.func, "attr", None) == "Page":
+            kwargs = {kw.arg: ast.literal_eval(kw.value) for kw in node.keywords
+                      if kw.arg in ("page", "title")}
+            script = node.args[0].value if node.args else kwargs["page"]
+            pages.append((script, kwargs.get("title", script)))
+    return pages
+
+
+class _ImageSpy:
+    """Counts the bytes ``st.image`` hands to the media manager."""
+
+    def __init__(self):
+        from streamlit.elements.lib import image_utils
+
+        self.module = image_utils
+        self.original = image_utils._ensure_image_size_and_format
+        self.sizes = []
+        image_utils._ensure_image_size_and_format = self
+
+    def __call__(self, *args, **kwargs):
+        data = self.original(*args, **kwargs)
+        self.sizes.append(len(data))
+        return data
+
+    def take(self):
+        sizes, self.sizes = self.sizes, []
+        return sizes
+
+
+def _walk(node):
+    yield node
+    for child in getattr(node, "children", {}).values():
+        yield from _walk(child)
+
+
+def _payload(at, image_sizes):
+    frames = [node.proto.arrow_data.ByteSize() for node in _walk(at.main)
+              if type(node).__name__ == "Dataframe"]
+    charts = [node.proto.ByteSize() for node in _walk(at.main)
+              if getattr(node, "type", None) in ("vega_lite_chart", "arrow_vega_lite_chart")]
+    remote = [node for node in _walk(at.main) if type(node).__name__ == "Image"
+              and any(img.url.startswith("http") for img in node.proto.imgs)]
+    return {
+        "dataframes": len(frames),
+        "dataframe_bytes": sum(frames),
+        "images": len(image_sizes) + len(remote),
+        "image_bytes": sum(image_sizes),
+        "remote_images": len(remote),
+        "chart_bytes": sum(charts),
+    }
+
+
+def _widget(at, kind, label):
+    for widget in getattr(at, kind):
+        if widget.label == label:
+            return widget
+    raise LookupError(f"no {kind} labelled {label!r}")
+
+
+def _timed_run(at):
+    start = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(f"page raised: {[e.value for e in at.exception]}")
+    return elapsed
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+def _warm_apptest(timeout):
+    from streamlit.testing.v1 import AppTest
+
+    # Pay for AppTest's own first-run setup before measuring the page
+    AppTest.from_string("import streamlit as st", default_timeout=timeout).run()
+    return AppTest
+
+
+def cold_allocations(script, timeout=120):
+    """Peak Python allocations of a page's first run, in a fresh process.
+
+    Kept apart from ``bench_page`` because tracing allocations slows the
+    traced run several times over.
+    """
+    AppTest = _warm_apptest(timeout)
+    tracemalloc.start()
+    _timed_run(AppTest.from_file(str(ROOT / script), default_timeout=timeout))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def bench_page(script, warm_runs=5, timeout=120):
+    """Benchmark one page. Meant to run in a fresh process."""
+    AppTest = _warm_apptest(timeout)
+    spy = _ImageSpy()
+    path = str(ROOT / script)
+
+    at = AppTest.from_file(path, default_timeout=timeout)
+    cold = _timed_run(at)
+    payload = _payload(at, spy.take())
+
+    warm = []
+    for _ in range(warm_runs):
+        at = AppTest.from_file(path, default_timeout=timeout)
+        warm.append(_timed_run(at))
+        spy.take()
+
+    interactions = []
+    for kind, label, value in INTERACTIONS.get(script, []):
+        widget = _widget(at, kind, label)
+        if kind == "selectbox":
+            widget.select(value)
+        else:
+            widget.set_value(value)
+        elapsed = _timed_run(at)
+        interactions.append({
+            "widget": f"{kind}:{label}",
+            "value": value,
+            "ms": _ms(elapsed),
+            **_payload(at, spy.take()),
+        })
+
+    return {
+        "cold_ms": _ms(cold),
+        "warm_ms_median": _ms(statistics.median(warm)),
+        "warm_ms_min": _ms(min(warm)),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        **payload,
+        "interactions": interactions,
+    }
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(warm_runs=5):
+    import pandas
+    import streamlit
+
+    ctx = multiprocessing.get_context("spawn")
+    results = {}
+    for script, title in registered_pages():
+        with ctx.Pool(1) as pool:
+            page = pool.apply(bench_page, (script, warm_runs))
+        with ctx.Pool(1) as pool:
+            page["cold_peak_alloc_mb"] = round(pool.apply(cold_allocations, (script,)) / 1e6, 2)
+        results[title] = {"script": script, **page}
+    return {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "streamlit": streamlit.__version__,
+        "pandas": pandas.__version__,
+        "warm_runs": warm_runs,
+        "pages": results,
+    }
+
+
+def _flatten(page):
+    flat = {k: v for k, v in page.items() if isinstance(v, (int, float))}
+    for step in page.get("interactions", []):
+        flat[f"{step['widget']}={step['value']} ms"] = step["ms"]
+    return flat
+
+
+def compare(baseline, current, threshold=0.2):
+    """Print every metric that moved by more than ``threshold``; return their count."""
+    regressions = 0
+    for title, page in current["pages"].items():
+        old = _flatten(baseline["pages"].get(title, {}))
+        for metric, value in _flatten(page).items():
+            before = old.get(metric)
+            if not before:
+                continue
+            change = (value - before) / before
+            if abs(change) > threshold:
+                regressions += change > 0
+                print(f"{title:32} {metric:48} {before:>10} -> {value:>10} ({change:+.0%})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", type=Path, help="write results to this JSON file")
+    parser.add_argument("--compare", type=Path, help="baseline JSON to diff against")
+    parser.add_argument("--runs", type=int, default=5, help="warm runs per page")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative change reported by --compare")
+    args = parser.parse_args(argv)
+
+    current = run(args.runs)
+    if args.output:
+        args.output.write_text(json.dumps(current, indent=2) + "\n")
+    else:
+        print(json.dumps(current, indent=2))
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        return 1 if compare(baseline, current, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,335 @@
+"""Concurrent-session load test for the Streamlit app.
+
+Starts ``streamlit run streamlit_app.py`` headless in its own process
+(pinned to one CPU where the platform allows it) and connects N simulated
+browser sessions to it over Streamlit's websocket protocol. Every session
+opens the default page, then keeps acting after an exponentially
+distributed think time: on the Nutrition Tool it changes the nutrient and
+profile selectboxes or the number input, and now and then it moves to
+another page registered in ``streamlit_app.py``. Each rerun is timed from
+the request to the server's ``script_finished`` message.
+
+The server is restarted and warmed for every N, so each level reports its
+own rerun latency percentiles, reruns per second, the server's CPU use and
+its resident memory per connected session. The saturation point is the
+first N whose p95 latency exceeds ``--slo-ms``.
+
+    python -m benchmarks.sessions                           # N = 1, 2, 4, 8, 16
+    python -m benchmarks.sessions --sessions 1 8 32 --duration 60 --think 2
+    python -m benchmarks.sessions -o sessions.json
+"""
+
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+APP = ROOT / "streamlit_app.py"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks.pages import registered_pages  # noqa: E402
+
+# (widget type, label) a session may change on each page; repeats weight the draw
+ACTIONS = {
+    "views/project1.py": [
+        ("selectbox", "Nutrient:"),
+        ("selectbox", "Nutrient:"),
+        ("number_input", "Number of foods:"),
+        ("number_input", "Number of foods:"),
+        ("selectbox", "Daily Value profile:"),
+    ],
+}
+MAX_FOODS = 25  # upper end of the "Number of foods" values sessions pick
+
+
+def _proc(pid):
+    """``(cpu seconds, rss bytes)`` of a process, from ``/proc`` (Linux only)."""
+    try:
+        fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+        cpu = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+        rss = int(fields[21]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, IndexError, ValueError):
+        return None, None
+    return cpu, rss
+
+
+class _Session:
+    """One headless browser tab: sends reruns, tracks the widgets on its page."""
+
+    def __init__(self, ws, rng):
+        self.ws = ws
+        self.rng = rng
+        self.pages = {}  # page title -> page script hash
+        self.page = None
+        self.widgets = {}  # (type, label) -> widget proto of the last run
+        self.states = {}  # widget id -> WidgetState the "user" has set
+
+    async def rerun(self, page_hash=None, timeout=120):
+        """Request a rerun and wait for it; returns (seconds, exception messages)."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        msg = BackMsg()
+        if page_hash is not None:
+            self.states = {}
+        # Like the browser, name the page on every rerun, or the default page runs
+        page_hash = self.page if page_hash is None else page_hash
+        if page_hash:
+            msg.rerun_script.page_script_hash = page_hash
+        msg.rerun_script.widget_states.widgets.extend(self.states.values())
+        widgets = {}
+        errors = []
+        start = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        while True:
+            reply = ForwardMsg()
+            reply.ParseFromString(await asyncio.wait_for(self.ws.recv(), timeout))
+            kind = reply.WhichOneof("type")
+            if kind == "navigation":
+                self.pages = {p.page_name: p.page_script_hash for p in reply.navigation.app_pages}
+                self.page = reply.navigation.page_script_hash
+            elif kind == "delta" and reply.delta.WhichOneof("type") == "new_element":
+                element = reply.delta.new_element
+                field = element.WhichOneof("type")
+                if field == "exception":
+                    errors.append(f"{element.exception.type}: {element.exception.message}")
+                elif field in ("selectbox", "number_input"):
+                    widget = getattr(element, field)
+                    widgets[(field, widget.label)] = widget
+            elif kind == "script_finished":
+                if reply.script_finished == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    continue
+                break
+        elapsed = time.perf_counter() - start
+        self.widgets = widgets
+        ids = {widget.id for widget in widgets.values()}
+        self.states = {wid: state for wid, state in self.states.items() if wid in ids}
+        return elapsed, errors
+
+    def change(self, kind, label):
+        """Set a widget on the current page to a random new value; False if it isn't there."""
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        widget = self.widgets.get((kind, label))
+        if widget is None:
+            return False
+        state = WidgetState(id=widget.id)
+        if kind == "selectbox":
+            state.string_value = self.rng.choice(widget.options)
+        else:
+            low = int(widget.min) if widget.has_min else 1
+            high = min(int(widget.max), MAX_FOODS) if widget.has_max else MAX_FOODS
+            state.double_value = self.rng.randint(low, high)
+        self.states[widget.id] = state
+        return True
+
+
+async def _session(port, scripts, duration, think, navigate, seed, records):
+    from websockets.asyncio.client import connect
+
+    rng = random.Random(seed)
+    deadline = time.perf_counter() + duration
+    # Arrivals are spread over the first think time, not all at once
+    await asyncio.sleep(rng.uniform(0, think))
+    async with connect(f"ws://127.0.0.1:{port}/_stcore/stream", subprotocols=["streamlit"],
+                       max_size=None) as ws:
+        session = _Session(ws, rng)
+        elapsed, errors = await session.rerun()
+        titles = {page_hash: title for title, page_hash in session.pages.items()}
+        records.append((titles.get(session.page), "load", elapsed, errors))
+        while True:
+            await asyncio.sleep(rng.expovariate(1 / think))
+            if time.perf_counter() >= deadline:
+                break
+            title = titles.get(session.page)
+            actions = ACTIONS.get(scripts.get(title), [])
+            if actions and rng.random() >= navigate and session.change(*rng.choice(actions)):
+                kind, page_hash = "widget", None
+            else:
+                title = rng.choice([t for t in session.pages if t != title])
+                kind, page_hash = "load", session.pages[title]
+            elapsed, errors = await session.rerun(page_hash)
+            records.append((title, kind, elapsed, errors))
+
+
+async def _visit_all(port):
+    """Load every page once in one session; raises if any of them fails."""
+    from websockets.asyncio.client import connect
+
+    async with connect(f"ws://127.0.0.1:{port}/_stcore/stream", subprotocols=["streamlit"],
+                       max_size=None) as ws:
+        session = _Session(ws, random.Random(0))
+        _, errors = await session.rerun()
+        for title, page_hash in list(session.pages.items()):
+            _, page_errors = await session.rerun(page_hash)
+            errors += [f"{title}: {error}" for error in page_errors]
+    if errors:
+        raise RuntimeError(f"warm-up failed: {errors}")
+
+
+async def _drive(port, scripts, sessions, duration, think, navigate, seed):
+    records = []
+    await asyncio.gather(*(
+        _session(port, scripts, duration, think, navigate, seed + i, records)
+        for i in range(sessions)
+    ))
+    return records
+
+
+def _wait_ready(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            conn.request("GET", "/_stcore/health")
+            status = conn.getresponse().status
+            conn.close()
+            if status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("Streamlit server did not start")
+
+
+def _start_server(port, server_cpu):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", str(APP),
+         "--server.headless", "true", "--server.port", str(port),
+         "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    if hasattr(os, "sched_setaffinity") and server_cpu is not None:
+        os.sched_setaffinity(server.pid, {server_cpu})
+    return server
+
+
+def _percentile(values, q):
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 1)
+
+
+def _latency(latencies):
+    latencies = sorted(latencies)
+    if not latencies:
+        return {}
+    return {
+        "mean": _ms(statistics.fmean(latencies)),
+        "p50": _ms(_percentile(latencies, 0.50)),
+        "p95": _ms(_percentile(latencies, 0.95)),
+        "p99": _ms(_percentile(latencies, 0.99)),
+        "max": _ms(latencies[-1]),
+    }
+
+
+def run_level(sessions, duration=30, think=3.0, navigate=0.2, port=8601, server_cpu=0, seed=0):
+    """Load one freshly started server with ``sessions`` concurrent sessions."""
+    scripts = {title: script for script, title in registered_pages()}
+    server = _start_server(port, server_cpu)
+    try:
+        _wait_ready(port)
+        # Fill the shared caches with one visit to every page before measuring
+        asyncio.run(_visit_all(port))
+        idle_cpu, idle_rss = _proc(server.pid)
+        start = time.perf_counter()
+        records = asyncio.run(_drive(port, scripts, sessions, duration, think, navigate, seed))
+        wall = time.perf_counter() - start
+        busy_cpu, busy_rss = _proc(server.pid)
+    finally:
+        server.terminate()
+        server.wait()
+
+    result = {
+        "sessions": sessions,
+        "reruns": len(records),
+        "reruns_per_s": round(len(records) / wall, 2),
+        "errors": sum(len(r[3]) for r in records),
+        "error_messages": sorted({message for r in records for message in r[3]}),
+        "latency_ms": _latency([r[2] for r in records]),
+        "widget_latency_ms": _latency([r[2] for r in records if r[1] == "widget"]),
+        "page_latency_ms": {
+            title: _latency([r[2] for r in records if r[0] == title])
+            for title in scripts if any(r[0] == title for r in records)
+        },
+    }
+    if idle_cpu is not None:
+        cpu = busy_cpu - idle_cpu
+        result.update({
+            "server_cpu_pct": round(100 * cpu / wall, 1),
+            "cpu_ms_per_rerun": _ms(cpu / max(len(records), 1)),
+            "cpu_ms_per_session_s": _ms(cpu / sessions / wall),
+            "idle_rss_mb": round(idle_rss / 2**20, 1),
+            "rss_mb": round(busy_rss / 2**20, 1),
+            "rss_mb_per_session": round((busy_rss - idle_rss) / 2**20 / sessions, 2),
+        })
+    return result
+
+
+def run(levels=(1, 2, 4, 8, 16), duration=30, think=3.0, navigate=0.2, port=8601,
+        server_cpu=0, slo_ms=1000):
+    import streamlit
+
+    results = []
+    for sessions in levels:
+        results.append(run_level(sessions, duration, think, navigate, port, server_cpu))
+        print(_row(results[-1]), file=sys.stderr)
+    saturated = [r["sessions"] for r in results if r["latency_ms"].get("p95", 0) > slo_ms]
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "streamlit": streamlit.__version__,
+        "cpus": os.cpu_count(),
+        "duration_s": duration,
+        "think_s": think,
+        "navigate": navigate,
+        "slo_p95_ms": slo_ms,
+        "saturation_sessions": saturated[0] if saturated else None,
+        "levels": results,
+    }
+
+
+def _row(level):
+    latency = level["latency_ms"]
+    return (f"N={level['sessions']:<4} {level['reruns_per_s']:>7} reruns/s  "
+            f"p50 {latency.get('p50', '-'):>7} ms  p95 {latency.get('p95', '-'):>7} ms  "
+            f"p99 {latency.get('p99', '-'):>7} ms  cpu {level.get('server_cpu_pct', '-'):>5}%  "
+            f"{level.get('rss_mb_per_session', '-')} MB/session  errors {level['errors']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8, 16],
+                        help="concurrent session counts to run, one server each")
+    parser.add_argument("--duration", type=float, default=30, help="seconds per level")
+    parser.add_argument("--think", type=float, default=3.0,
+                        help="mean seconds a session waits between actions")
+    parser.add_argument("--navigate", type=float, default=0.2,
+                        help="share of actions that move to another page")
+    parser.add_argument("--port", type=int, default=8601)
+    parser.add_argument("--slo-ms", type=float, default=1000,
+                        help="p95 rerun latency that marks saturation")
+    parser.add_argument("-o", "--output", type=Path, help="write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    result = run(args.sessions, args.duration, args.think, args.navigate, args.port,
+                 slo_ms=args.slo_ms)
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2) + "\n")
+    else:
+        print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
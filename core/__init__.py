@@ -0,0 +1 @@
+"""Shared data and helpers used by the pages in ``views/``."""
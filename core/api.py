@@ -0,0 +1,423 @@
+"""Headless JSON API over the cached nutrient dataset.
+
+Other services can ask for the same answers the Nutrition Tool shows
+without rendering the page. The API reads the process-wide dataset from
+``load_nutrients()`` and its rankings, search and filter indexes, so it
+costs no extra memory next to the app. Every response is serialized once,
+gzipped when that pays off, and kept with its ETag in an LRU cache keyed on
+the dataset version and the request and bounded by ``CACHE_BYTES``. A repeat
+request is a dictionary lookup, or a bodiless 304 when the client sends the
+ETag back.
+
+    GET /api/nutrients
+    GET /api/top?nutrient=Selenium (mcg)&n=10&ascending=0&per_kcal=0&profile=adult
+    GET /api/foods/<food code>?profile=adult
+    GET /api/search?q=brazil nuts&limit=20&scope=cleaned
+    GET /api/filter?ge=Magnesium PDV:20&le=Sodium PDV:5&exclude=71,72&limit=100
+    GET /api/export?format=parquet&ge=Magnesium PDV:20&column=Main food description&sort=Magnesium PDV
+    GET /api/stats
+
+Exports are streamed with chunked transfer encoding the first time and
+served from ``core.export``'s cache after that.
+
+The server starts alongside the app when ``APP_API_PORT`` is set, or on its
+own with ``python -m core.api --port 8502``.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlencode, urlsplit
+
+import numpy as np
+
+from core.daily_values import DEFAULT_PROFILE, PROFILES
+from core.dataset import FNDDS_CSV, load_nutrients
+from core.export import FORMATS, ITERATORS, cached, export_key, store
+from core.instrument import count, register_gauge, stage
+from core.query import Predicate
+from core.rankings import ID_COLUMNS
+from core.tables import sort_positions
+
+CACHE_BYTES = 16 << 20
+GZIP_MIN_BYTES = 1024
+MAX_LIMIT = 500
+DESCRIPTION_COLUMNS = ("Food code", "Main food description", "WWEIA Category description")
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass(frozen=True)
+class Response:
+    status: int
+    body: bytes
+    gzipped: bytes  # None when compressing would not help
+    etag: str
+
+    @property
+    def size(self):
+        return len(self.body) + len(self.gzipped or b"")
+
+
+def _response(status, payload):
+    body = json.dumps(payload, separators=(",", ":"), allow_nan=False).encode()
+    gzipped = gzip.compress(body, 6) if len(body) >= GZIP_MIN_BYTES else None
+    etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+    return Response(status, body, gzipped, etag)
+
+
+def _records(frame):
+    # float32 values go out as their shortest repr (166.7, as in the CSV
+    # export), not as the widened double 166.6999969482
+    narrow = [col for col, dtype in frame.dtypes.items() if dtype == np.float32]
+    if narrow:
+        frame = frame.astype({col: str for col in narrow}).astype({col: np.float64 for col in narrow})
+    # pandas writes NaN as null, which json.dumps would not
+    return json.loads(frame.to_json(orient="records", double_precision=15))
+
+
+def _param(params, name, default=None, cast=str):
+    values = params.get(name)
+    if not values:
+        if default is None:
+            raise ApiError(400, f"missing parameter {name!r}")
+        values = [default]
+    try:
+        return cast(values[-1])
+    except ValueError:
+        raise ApiError(400, f"bad value for {name!r}: {values[-1]!r}") from None
+
+
+def _flag(value):
+    return value.lower() in ("1", "true", "yes")
+
+
+def _limit(params, default):
+    return max(0, min(_param(params, "limit", default, int), MAX_LIMIT))
+
+
+def _profile(data, params):
+    profile = _param(params, "profile", DEFAULT_PROFILE)
+    if profile not in PROFILES:
+        raise ApiError(400, f"unknown profile {profile!r}; expected one of {list(PROFILES)}")
+    return profile, data.for_profile(profile)
+
+
+def _column(frame, name):
+    if name not in frame.columns or name in ID_COLUMNS:
+        raise ApiError(400, f"unknown nutrient {name!r}")
+    return name
+
+
+def _nutrients(data, params):
+    return {
+        "nutrients": data.rankings.columns,
+        "profiles": PROFILES,
+        "default_profile": DEFAULT_PROFILE,
+    }
+
+
+def _top(data, params):
+    profile, frame = _profile(data, params)
+    nutrient = _column(frame, _param(params, "nutrient"))
+    n = max(0, min(_param(params, "n", 10, int), len(frame)))
+    ascending = _param(params, "ascending", "0", _flag)
+    per_kcal = _param(params, "per_kcal", "0", _flag)
+    # %DV is a positive rescaling, so the default-profile rankings hold for every profile
+    positions = data.rankings.positions(nutrient, n, ascending, per_kcal)
+    return {
+        "nutrient": nutrient,
+        "profile": profile,
+        "ascending": ascending,
+        "per_kcal": per_kcal,
+        "foods": _records(frame.iloc[positions][[*DESCRIPTION_COLUMNS, nutrient]]),
+    }
+
+
+def _food(data, params, code):
+    profile, frame = _profile(data, params)
+    try:
+        code = int(code)
+    except ValueError:
+        raise ApiError(400, f"bad food code {code!r}") from None
+    rows = frame[frame["Food code"] == code]
+    if rows.empty:
+        raise ApiError(404, f"food {code} is not in the cleaned table")
+    return {"profile": profile, "food": _records(rows)[0]}
+
+
+def _search(data, params):
+    scope = _param(params, "scope", "cleaned")
+    if scope not in data.search:
+        raise ApiError(400, f"unknown scope {scope!r}; expected one of {list(data.search)}")
+    frame = data.raw if scope == "raw" else data.cleaned
+    rows = data.search[scope].search(frame, _param(params, "q"), _limit(params, 20))
+    return {"scope": scope, "foods": _records(rows[list(DESCRIPTION_COLUMNS)])}
+
+
+def _predicates(frame, params):
+    predicates = []
+    for name, op in (("ge", ">="), ("le", "<=")):
+        for value in params.get(name, ()):
+            column, _, bound = value.rpartition(":")
+            try:
+                predicates.append(Predicate(_column(frame, column), op, float(bound)))
+            except ValueError:
+                raise ApiError(400, f"bad {name} filter {value!r}; expected <column>:<number>") from None
+    return tuple(predicates)
+
+
+def _exclude(params):
+    return tuple(p for value in params.get("exclude", ()) for p in value.split(",") if p)
+
+
+def _filter(data, params):
+    profile, frame = _profile(data, params)
+    predicates = _predicates(frame, params)
+    exclude = _exclude(params)
+    positions = data.query[profile].evaluate(predicates, exclude)
+    columns = list(dict.fromkeys([*DESCRIPTION_COLUMNS, *(p.column for p in predicates)]))
+    return {
+        "profile": profile,
+        "count": len(positions),
+        "foods": _records(frame.iloc[positions[:_limit(params, 100)]][columns]),
+    }
+
+
+def export_request(data, params):
+    """``(format, frame, positions, columns, version)`` for an ``/api/export`` request.
+
+    Takes the ``/api/filter`` parameters, plus ``column`` (repeated; default
+    every column), ``sort``, ``ascending`` and ``format`` (csv or parquet).
+    """
+    fmt = _param(params, "format", "csv")
+    if fmt not in FORMATS:
+        raise ApiError(400, f"unknown format {fmt!r}; expected one of {list(FORMATS)}")
+    profile, frame = _profile(data, params)
+    positions = data.query[profile].evaluate(_predicates(frame, params), _exclude(params))
+    sort_by = params.get("sort", [None])[-1]
+    if sort_by is not None and sort_by not in frame.columns:
+        raise ApiError(400, f"unknown sort column {sort_by!r}")
+    positions = sort_positions(frame, positions, sort_by, _param(params, "ascending", "1", _flag))
+    columns = params.get("column") or list(frame.columns)
+    unknown = [col for col in columns if col not in frame.columns]
+    if unknown:
+        raise ApiError(400, f"unknown columns {unknown}")
+    return fmt, frame, positions, columns, (data.sha256, profile)
+
+
+ROUTES = {
+    "/api/nutrients": _nutrients,
+    "/api/top": _top,
+    "/api/search": _search,
+    "/api/filter": _filter,
+}
+FOOD_PREFIX = "/api/foods/"
+EXPORT_PATH = "/api/export"
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+
+
+_lock = threading.Lock()
+_cache = OrderedDict()  # (dataset mtime, path, query) -> Response
+_cached_bytes = 0
+_stats = CacheStats()
+_server = None
+
+
+def _dispatch(path, params):
+    if path == "/api/stats":
+        with _lock:
+            return 200, {"cached": len(_cache), "bytes": _cached_bytes, "hits": _stats.hits, "misses": _stats.misses}
+    handler = ROUTES.get(path)
+    if handler is None and not path.startswith(FOOD_PREFIX):
+        raise ApiError(404, f"no such endpoint {path!r}")
+    with stage("api_build"):
+        data = load_nutrients()
+        if handler is None:
+            return 200, _food(data, params, unquote(path[len(FOOD_PREFIX):]))
+        return 200, handler(data, params)
+
+
+def respond(target):
+    """The ``Response`` for a request target such as ``/api/top?nutrient=...``."""
+    global _cached_bytes
+    url = urlsplit(target)
+    path = url.path.rstrip("/")
+    if path == "/api/stats":
+        return _response(*_dispatch(path, {}))
+    # The source file's mtime stands in for the dataset version; load_nutrients
+    # rebuilds when it changes, so cached answers must not outlive it
+    key = (os.stat(FNDDS_CSV).st_mtime_ns, path, url.query)
+    with _lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            _stats.hits += 1
+            return cached
+        _stats.misses += 1
+    try:
+        response = _response(*_dispatch(path, parse_qs(url.query)))
+    except ApiError as exc:
+        response = _response(exc.status, {"error": str(exc)})
+    with _lock:
+        if key not in _cache and response.size <= CACHE_BYTES:
+            _cache[key] = response
+            _cached_bytes += response.size
+            while _cached_bytes > CACHE_BYTES:
+                _, dropped = _cache.popitem(last=False)
+                _cached_bytes -= dropped.size
+    return response
+
+
+def warm():
+    """Serve the nutrient list and every default top-10 query once."""
+    respond("/api/nutrients")
+    data = load_nutrients()
+    for nutrient in data.rankings.columns:
+        respond("/api/top?" + urlencode({"nutrient": nutrient}))
+
+
+register_gauge("api_cache_hits", lambda: _stats.hits)
+register_gauge("api_cache_misses", lambda: _stats.misses)
+register_gauge("api_cache_entries", lambda: len(_cache))
+register_gauge("api_cache_bytes", lambda: _cached_bytes)
+
+
+class _APIHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so clients do not pay a TCP handshake per request
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in one write after the handler returns;
+    # separate small writes stall on Nagle plus delayed ACKs (~40 ms)
+    wbufsize = 1 << 16
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        count("api_requests")
+        try:
+            if urlsplit(self.path).path.rstrip("/") == EXPORT_PATH:
+                self._export()
+                return
+            response = respond(self.path)
+        except Exception as exc:  # report, don't drop the connection
+            self.log_error("%s: %r", self.path, exc)
+            response = _response(500, {"error": "internal error"})
+        if response.status == 200 and self._not_modified(response.etag):
+            return
+        body = response.body
+        self.send_response(response.status)
+        self.send_header("Content-Type", "application/json")
+        if response.gzipped is not None and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = response.gzipped
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", response.etag)
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _not_modified(self, etag):
+        """Send a 304 if the client already has ``etag``."""
+        match = [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]
+        if "*" not in match and etag not in match:
+            return False
+        self.send_response(304)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+        return True
+
+    def _export(self):
+        try:
+            fmt, frame, positions, columns, version = export_request(
+                load_nutrients(), parse_qs(urlsplit(self.path).query)
+            )
+        except ApiError as exc:
+            response = _response(exc.status, {"error": str(exc)})
+            self.send_response(response.status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(response.body)))
+            self.end_headers()
+            self.wfile.write(response.body)
+            return
+        key = export_key(version, positions, columns, fmt)
+        etag = f'"{key[:24]}"'
+        if self._not_modified(etag):
+            return
+        data = cached(key)
+        self.send_response(200)
+        self.send_header("Content-Type", FORMATS[fmt])
+        self.send_header("Content-Disposition", f'attachment; filename="fndds_export.{fmt}"')
+        self.send_header("ETag", etag)
+        if data is not None:
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        parts = []
+        # The status line is out, so a failure can no longer become a 500:
+        # drop the connection without the terminating chunk, which tells the
+        # client the body is incomplete
+        try:
+            with stage(f"api_export_{fmt}"):
+                for chunk in ITERATORS[fmt](frame, positions, columns):
+                    if chunk:
+                        self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                        parts.append(chunk)
+                self.wfile.write(b"0\r\n\r\n")
+        except Exception as exc:
+            self.log_error("%s: export failed mid-stream: %r", self.path, exc)
+            self.close_connection = True
+            return
+        store(key, b"".join(parts))
+
+    def log_message(self, *args):
+        pass
+
+
+def start_api_server(port, host="127.0.0.1"):
+    """Serve the API on a daemon thread and warm its cache; later calls are no-ops."""
+    global _server
+    with _lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _APIHandler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="api", daemon=True).start()
+            threading.Thread(target=warm, name="api-warm", daemon=True).start()
+    return _server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--host", default="127.0.0.1")
+    args = parser.parse_args(argv)
+    warm()
+    server = ThreadingHTTPServer((args.host, args.port), _APIHandler)
+    server.daemon_threads = True
+    print(f"serving on http://{args.host}:{args.port}/api/", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""FDA Daily Values and the %DV columns derived from them.
+
+The reference values live in one versioned table with a column per FDA
+label profile. ``pdv_block()`` divides the nutrient matrix by a profile's DV
+vector in a single broadcast, and ``with_profile()`` attaches the result as
+one block instead of inserting the columns one at a time.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# https://www.fda.gov/food/nutrition-facts-label/daily-value-nutrition-and-supplement-facts-labels
+VERSION = "FDA 2016 (21 CFR 101.9 / 101.36)"
+
+PROFILES = {
+    "adult": "Adults and children 4 years and older",
+    "child": "Children 1 through 3 years",
+    "pregnancy": "Pregnant and lactating women",
+}
+DEFAULT_PROFILE = "adult"
+
+DailyValue = namedtuple("DailyValue", "name column adult child pregnancy enabled")
+
+DAILY_VALUES = (
+    DailyValue("Protein", "Protein (g)", 50, 13, 71, True),
+    DailyValue("Carbohydrate", "Carbohydrate (g)", 275, 150, 175, True),
+    DailyValue("Total Fat", "Total Fat (g)", 78, 39, 78, True),
+    DailyValue("Cholesterol", "Cholesterol (mg)", 300, 300, 300, True),
+    DailyValue("Vitamin A, RAE", "Vitamin A, RAE (mcg_RAE)", 900, 300, 1300, True),
+    DailyValue("Thiamin", "Thiamin (mg)", 1.2, 0.5, 1.4, True),
+    DailyValue("Riboflavin", "Riboflavin (mg)", 1.3, 0.5, 1.6, True),
+    DailyValue("Vitamin B-6", "Vitamin B-6 (mg)", 1.7, 0.5, 2.0, True),
+    DailyValue("Folate, DFE", "Folate, DFE (mcg_DFE)", 400, 150, 600, True),
+    DailyValue("Choline, total", "Choline, total (mg)", 550, 200, 550, True),
+    DailyValue("Vitamin B-12", "Vitamin B-12 (mcg)", 2.4, 0.9, 2.8, True),
+    DailyValue("Vitamin C", "Vitamin C (mg)", 90, 15, 120, True),
+    DailyValue("Vitamin D (D2 + D3)", "Vitamin D (D2 + D3) (mcg)", 20, 15, 15, True),
+    DailyValue("Vitamin E (alpha-tocopherol)", "Vitamin E (alpha-tocopherol) (mg)", 15, 6, 19, True),
+    DailyValue("Vitamin K (phylloquinone)", "Vitamin K (phylloquinone) (mcg)", 120, 30, 90, True),
+    DailyValue("Calcium", "Calcium (mg)", 1300, 700, 1300, True),
+    DailyValue("Phosphorus", "Phosphorus (mg)", 1250, 460, 1250, True),
+    DailyValue("Magnesium", "Magnesium (mg)", 420, 80, 400, True),
+    # Iron and Zinc have DVs but are left out of the tool
+    DailyValue("Iron", "Iron (mg)", 18, 7, 27, False),
+    DailyValue("Zinc", "Zinc (mg)", 11, 3, 13, False),
+    DailyValue("Copper", "Copper (mg)", 0.9, 0.3, 1.3, True),
+    DailyValue("Selenium", "Selenium (mcg)", 55, 20, 70, True),
+    DailyValue("Potassium", "Potassium (mg)", 4700, 3000, 5100, True),
+    DailyValue("Sodium", "Sodium (mg)", 2300, 1500, 2300, True),
+)
+
+ENABLED = tuple(dv for dv in DAILY_VALUES if dv.enabled)
+PDV_COLUMNS = tuple(f"{dv.name} PDV" for dv in ENABLED)
+
+
+def dv_vector(profile=DEFAULT_PROFILE):
+    if profile not in PROFILES:
+        raise KeyError(f"unknown Daily Value profile {profile!r}; expected one of {list(PROFILES)}")
+    return np.array([getattr(dv, profile) for dv in ENABLED], dtype=np.float64)
+
+
+def pdv_block(frame, profile=DEFAULT_PROFILE):
+    """%DV of every enabled nutrient in ``frame`` as a single DataFrame."""
+    amounts = frame[[dv.column for dv in ENABLED]].to_numpy()
+    pdv = (amounts / dv_vector(profile)) * 100
+    # Keep float32 inputs (from the snapshot) float32
+    dtype = np.result_type(amounts.dtype, np.float32)
+    return pd.DataFrame(pdv.astype(dtype, copy=False), index=frame.index, columns=list(PDV_COLUMNS))
+
+
+def with_profile(frame, profile=DEFAULT_PROFILE):
+    """``frame`` with its %DV columns (if any) replaced by ``profile``'s."""
+    base = frame.drop(columns=[col for col in PDV_COLUMNS if col in frame])
+    return pd.concat([base, pdv_block(base, profile)], axis=1)
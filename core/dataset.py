@@ -0,0 +1,190 @@
+"""Process-wide cache for the FNDDS nutrient dataset.
+
+Streamlit re-executes a page script on every widget change, so parsing and
+cleaning the USDA CSV inside ``views/project1.py`` meant redoing all of that
+work on every click. ``load_nutrients()`` does it once per process and hands
+every session the same frames. The cache is keyed on the source file's mtime
+and content hash, so editing the CSV invalidates it. When a fresh snapshot
+built by ``python -m core.snapshot`` exists, it is used instead of the CSV.
+"""
+
+import hashlib
+import threading
+from dataclasses import dataclass, replace
+from pathlib import Path
+from types import MappingProxyType
+
+import pandas as pd
+
+from core.daily_values import DEFAULT_PROFILE, PROFILES, with_profile
+from core.instrument import register_gauge, stage
+from core.query import QueryEngine
+from core.rankings import NutrientRankings
+from core.rules import apply_rules
+from core.search import SearchIndex
+from core.similarity import SimilarityIndex
+from core.snapshot import read_snapshot
+
+ASSETS_DIR = Path(__file__).resolve().parent.parent / "assets"
+FNDDS_CSV = ASSETS_DIR / "FNDDS Nutrient Values.csv"
+
+
+@dataclass(frozen=True)
+class NutrientDataset:
+    """Raw and cleaned FNDDS frames for one version of the source file.
+
+    ``cleaned`` carries %DV columns for the default (adult) profile;
+    ``profiles`` holds the cleaned table under every Daily Value profile.
+    ``search`` maps ``"raw"`` and ``"cleaned"`` to their search indexes and
+    ``query`` maps each profile to the filter engine for its table, and
+    ``similarity`` maps ``"raw"`` and ``"cleaned"`` to nearest-neighbour
+    indexes. The mappings are read-only, and so is everything the shared
+    indexes expose, since every session holds the same objects.
+    """
+
+    raw: pd.DataFrame
+    cleaned: pd.DataFrame
+    profiles: dict
+    rankings: NutrientRankings
+    search: dict
+    query: dict
+    similarity: dict
+    source: Path
+    mtime_ns: int
+    sha256: str
+
+    def for_profile(self, profile=DEFAULT_PROFILE):
+        return self.profiles[profile]
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+
+
+_lock = threading.Lock()
+_entries = {}  # resolved path -> NutrientDataset
+_stats = CacheStats()
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_raw(path):
+    # The first row is a two-line banner, not the header
+    return pd.read_csv(path, skiprows=[0])
+
+
+def _fix_columns(frame):
+    # Some headers are split over two lines in the CSV
+    frame = frame.copy()
+    frame.columns = [" ".join(col.split("\n")) for col in frame.columns]
+    return frame
+
+
+def build_dataset(path=FNDDS_CSV, use_snapshot=True):
+    """Build the dataset for ``path`` without caching.
+
+    Uses the memory-mapped snapshot from ``core.snapshot`` when it is fresh
+    and otherwise parses, cleans and derives from the CSV.
+    """
+    path = Path(path).resolve()
+    mtime_ns = path.stat().st_mtime_ns
+    snap = None
+    if use_snapshot:
+        with stage("snapshot_load"):
+            snap = read_snapshot(path, mtime_ns, _file_hash)
+    if snap is not None:
+        raw, cleaned, sha256 = snap
+    else:
+        sha256 = _file_hash(path)
+        with stage("csv_load"):
+            raw = _read_raw(path)
+        with stage("header_fixup"):
+            fixed = _fix_columns(raw)
+        with stage("row_filter"):
+            kept = apply_rules(fixed)
+        with stage("pdv"):
+            cleaned = with_profile(kept)
+    # %DV blocks are small, so every profile is built up front and switching
+    # profile in the UI never recomputes anything
+    with stage("pdv_profiles"):
+        profiles = {name: with_profile(cleaned, name) for name in PROFILES if name != DEFAULT_PROFILE}
+        profiles[DEFAULT_PROFILE] = cleaned
+    with stage("rankings"):
+        rankings = NutrientRankings(cleaned)
+    with stage("search_index"):
+        search = MappingProxyType({"raw": SearchIndex(raw), "cleaned": SearchIndex(cleaned)})
+    with stage("query_engines"):
+        query = MappingProxyType({name: QueryEngine(frame) for name, frame in profiles.items()})
+    with stage("similarity_index"):
+        similarity = MappingProxyType(
+            {"raw": SimilarityIndex(_fix_columns(raw)), "cleaned": SimilarityIndex(cleaned)}
+        )
+    return NutrientDataset(
+        raw, cleaned, MappingProxyType(profiles), rankings, search, query, similarity,
+        path, mtime_ns, sha256,
+    )
+
+
+def _view(dataset):
+    # Shallow copies share memory with the cached frames; copy-on-write
+    # (always on in pandas >= 3) keeps a session's edits (new columns,
+    # assignments) out of the shared copy.
+    return NutrientDataset(
+        dataset.raw.copy(deep=False),
+        dataset.cleaned.copy(deep=False),
+        MappingProxyType({name: frame.copy(deep=False) for name, frame in dataset.profiles.items()}),
+        dataset.rankings,
+        dataset.search,
+        dataset.query,
+        dataset.similarity,
+        dataset.source,
+        dataset.mtime_ns,
+        dataset.sha256,
+    )
+
+
+def load_nutrients(path=FNDDS_CSV):
+    """Return the FNDDS dataset, parsing the CSV only when it has changed.
+
+    A matching mtime is a hit. A changed mtime with unchanged content (e.g. a
+    ``touch``) is also a hit, after re-hashing the file once.
+    """
+    path = Path(path).resolve()
+    # The stage is entered before _lock so that, with allocation tracing on,
+    # every caller takes instrument's trace lock first; the stages inside
+    # build_dataset then never wait for it while holding _lock
+    with stage("load_dataset"), _lock:
+        cached = _entries.get(path)
+        mtime_ns = path.stat().st_mtime_ns
+        if cached is not None and cached.mtime_ns != mtime_ns:
+            if _file_hash(path) == cached.sha256:
+                cached = replace(cached, mtime_ns=mtime_ns)
+                _entries[path] = cached
+            else:
+                cached = None
+        if cached is None:
+            _stats.misses += 1
+            cached = build_dataset(path)
+            _entries[path] = cached
+        else:
+            _stats.hits += 1
+        return _view(cached)
+
+
+register_gauge("dataset_cache_hits", lambda: _stats.hits)
+register_gauge("dataset_cache_misses", lambda: _stats.misses)
+
+
+def cache_info():
+    """Return a snapshot of the loader's hit/miss counters."""
+    with _lock:
+        return CacheStats(_stats.hits, _stats.misses)
+
@@ -0,0 +1,150 @@
+"""CSV and Parquet exports of a table view, generated in chunks and cached.
+
+An export is a set of row positions and columns of one of the shared
+frames. ``iter_csv()`` and ``iter_parquet()`` yield the file a chunk (or
+Parquet row group) at a time straight from that frame, so nothing the size
+of the export is built in a session. ``export_bytes()`` joins the chunks
+once per distinct export. Exports are keyed by a hash of the data version,
+positions, columns and format, so repeat downloads of the same view are
+served from a process-wide cache bounded by ``CACHE_BYTES``.
+``download_buttons()`` renders Streamlit buttons that only build the file
+when clicked.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from core.instrument import register_gauge, stage
+from core.tables import for_display
+
+CHUNK_ROWS = 5000
+CACHE_BYTES = 64 << 20
+FORMATS = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+LABELS = {"csv": "CSV", "parquet": "Parquet"}
+
+
+def export_key(version, positions, columns, fmt):
+    """Hash identifying one export of a view of the frame at ``version``."""
+    digest = hashlib.sha256(repr((version, tuple(columns), fmt)).encode())
+    digest.update(np.ascontiguousarray(positions, dtype=np.int64).tobytes())
+    return digest.hexdigest()
+
+
+def _chunks(frame, positions, columns, chunk_rows):
+    for start in range(0, len(positions), chunk_rows):
+        yield for_display(frame.iloc[positions[start:start + chunk_rows]][list(columns)])
+
+
+def iter_csv(frame, positions, columns, chunk_rows=CHUNK_ROWS):
+    """The rows of ``frame`` at ``positions`` as CSV, in encoded chunks."""
+    yield frame.iloc[:0][list(columns)].to_csv(index=False).encode()
+    for rows in _chunks(frame, positions, columns, chunk_rows):
+        yield rows.to_csv(header=False, index=False).encode()
+
+
+class _Spool:
+    """Write-only file that hands back whatever was written since the last drain."""
+
+    def __init__(self):
+        self.parts = []
+        self.size = 0
+        self.closed = False
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.size
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data, self.parts = b"".join(self.parts), []
+        return data
+
+
+def iter_parquet(frame, positions, columns, chunk_rows=CHUNK_ROWS):
+    """The rows of ``frame`` at ``positions`` as Parquet, one row group per chunk."""
+    spool = _Spool()
+    writer = None
+    for rows in _chunks(frame, positions, columns, chunk_rows):
+        table = pa.Table.from_pandas(rows, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(spool, table.schema, compression="zstd")
+        writer.write_table(table)
+        yield spool.drain()
+    if writer is None:
+        # No rows: still a valid file with the columns' schema
+        empty = frame.iloc[:0][list(columns)]
+        writer = pq.ParquetWriter(spool, pa.Schema.from_pandas(for_display(empty), preserve_index=False))
+    writer.close()
+    yield spool.drain()
+
+
+ITERATORS = {"csv": iter_csv, "parquet": iter_parquet}
+
+_lock = threading.Lock()
+_cache = OrderedDict()  # export key -> bytes
+_cached_bytes = 0
+
+
+def cached(key):
+    with _lock:
+        data = _cache.get(key)
+        if data is not None:
+            _cache.move_to_end(key)
+        return data
+
+
+def store(key, data):
+    global _cached_bytes
+    with _lock:
+        if key not in _cache and len(data) <= CACHE_BYTES:
+            _cache[key] = data
+            _cached_bytes += len(data)
+            while _cached_bytes > CACHE_BYTES:
+                _, dropped = _cache.popitem(last=False)
+                _cached_bytes -= len(dropped)
+    return data
+
+
+def export_bytes(frame, positions, columns, fmt, version):
+    """The whole export as bytes, built at most once per distinct export."""
+    key = export_key(version, positions, columns, fmt)
+    data = cached(key)
+    if data is None:
+        with stage(f"export_{fmt}"):
+            data = store(key, b"".join(ITERATORS[fmt](frame, positions, columns)))
+    return data
+
+
+register_gauge("export_cache_entries", lambda: len(_cache))
+register_gauge("export_cache_bytes", lambda: _cached_bytes)
+
+
+def download_buttons(frame, positions, columns, name, version, key):
+    """CSV and Parquet download buttons for a view; files are built on click."""
+    import streamlit as st
+
+    positions = np.asarray(positions)
+    columns = list(columns)
+    for fmt, col in zip(FORMATS, st.columns(len(FORMATS))):
+        col.download_button(
+            f"Download {LABELS[fmt]} ({len(positions)} rows)",
+            lambda fmt=fmt: export_bytes(frame, positions, columns, fmt, version),
+            file_name=f"{name}.{fmt}",
+            mime=FORMATS[fmt],
+            key=f"{key}_download_{fmt}",
+            on_click="ignore",
+        )
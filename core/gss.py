@@ -0,0 +1,231 @@
+"""Weighted logistic regression for the GSS happiness models.
+
+Models 1-3 on the GSS Happiness page were fitted in R and exported as
+images. ``GSSModels.fit()`` refits them in-process from a local GSS extract.
+The fit is iteratively reweighted least squares, where every iteration is a
+few NumPy matrix products, and rows are weighted by WTSSNRPS. Fits are
+memoized per predictor set, so toggling predictors only pays for a fit the
+first time a combination is seen.
+
+The extract is not in the repo. Put a CSV or Stata file with the columns in
+``VARIABLES`` (standard GSS numeric codes) at ``assets/gss_happiness.csv``,
+or point ``APP_GSS_EXTRACT`` at it.
+"""
+
+import math
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from core.gss_extract import GSS_EXTRACT, VARIABLES, extract_path
+
+YEARS = (2016, 2022)
+
+# Term -> its design columns; the reference levels are Democrat, white, male,
+# unmarried and not very happily married
+TERMS = {
+    "Partisanship": ("Independent", "Republican"),
+    "Age": ("Age",),
+    "Race": ("Black", "Other race"),
+    "Sex": ("Female",),
+    "Marital status": ("Married",),
+    "Marital happiness": ("Very happily married",),
+}
+MODELS = {
+    "Model 1": ("Partisanship", "Age", "Race", "Sex"),
+    "Model 2": ("Partisanship", "Age", "Race", "Sex", "Marital status"),
+    "Model 3": ("Partisanship", "Age", "Race", "Sex", "Marital happiness"),
+}
+Z_95 = 1.959963984540054
+SINGULAR = "too few complete responses, or predictors that are constant or collinear"
+
+
+def read_extract(path):
+    """The ``VARIABLES`` columns of a GSS extract, as numbers (NaN if missing)."""
+    path = Path(path)
+    if path.suffix.lower() == ".dta":
+        frame = pd.read_stata(path, convert_categoricals=False)
+    else:
+        frame = pd.read_csv(path, low_memory=False)
+    frame.columns = [col.lower() for col in frame.columns]
+    missing = [var for var in VARIABLES if var not in frame]
+    if missing:
+        raise ValueError(f"{path} is missing GSS variables {missing}")
+    return frame[list(VARIABLES)].apply(pd.to_numeric, errors="coerce")
+
+
+def _recode(gss):
+    """Outcome and design columns from GSS codes; NaN marks a missing answer."""
+    def where(cond, valid):
+        return np.where(valid, cond, np.nan)
+
+    party, race, sex = gss["partyid"], gss["race"], gss["sex"]
+    party_ok = party.between(0, 6)
+    race_ok = race.isin([1, 2, 3])
+    marital_ok = gss["marital"].between(1, 5)
+    columns = {
+        "Independent": where(party.between(2, 4), party_ok),
+        "Republican": where(party.between(5, 6), party_ok),
+        "Age": gss["age"].where(gss["age"].between(18, 89)).to_numpy(dtype=np.float64),
+        "Black": where(race == 2, race_ok),
+        "Other race": where(race == 3, race_ok),
+        "Female": where(sex == 2, sex.isin([1, 2])),
+        "Married": where(gss["marital"] == 1, marital_ok),
+        # Unmarried and "don't know" both count as not very happily married
+        "Very happily married": (gss["hapmar"] == 1).to_numpy(dtype=np.float64),
+    }
+    # "Don't know" (8, or -98 in newer extracts) counts as not very happy
+    answered = gss["happy"].isin([1, 2, 3, 8, -98])
+    y = where(gss["happy"] == 1, answered)
+    weight = gss["wtssnrps"].where(gss["wtssnrps"] > 0).to_numpy(dtype=np.float64)
+    in_years = gss["year"].between(*YEARS).to_numpy()
+    keep = in_years & np.isfinite(y) & np.isfinite(weight)
+    return {name: col[keep] for name, col in columns.items()}, y[keep], weight[keep]
+
+
+def fit_logit(X, y, w, max_iter=25, tol=1e-8):
+    """Weighted logistic regression by IRLS.
+
+    Returns ``(coef, cov, iterations, converged)``. ``cov`` is the inverse
+    of the weighted Fisher information, the same standard errors R's
+    ``glm(..., weights=)`` reports. Raises ``ValueError`` when the design
+    has no more rows than columns or is not of full column rank.
+    """
+    if len(y) <= X.shape[1] or np.linalg.matrix_rank(X) < X.shape[1]:
+        raise ValueError(SINGULAR)
+    beta = np.zeros(X.shape[1])
+    converged = False
+    try:
+        for iteration in range(1, max_iter + 1):
+            mu = 1.0 / (1.0 + np.exp(-(X @ beta)))
+            info = X.T @ (X * (w * mu * (1.0 - mu))[:, None])
+            step = np.linalg.solve(info, X.T @ (w * (y - mu)))
+            beta += step
+            if np.max(np.abs(step)) < tol:
+                converged = True
+                break
+        mu = 1.0 / (1.0 + np.exp(-(X @ beta)))
+        info = X.T @ (X * (w * mu * (1.0 - mu))[:, None])
+        cov = np.linalg.inv(info)
+    except np.linalg.LinAlgError:
+        # Full rank, but the fit ran off to a singular information matrix
+        # (e.g. a predictor that separates the outcome)
+        raise ValueError(SINGULAR) from None
+    return beta, cov, iteration, converged
+
+
+def fit_logit_batch(X, y, W, start=None, max_iter=25, tol=1e-8):
+    """Fit one weighted logistic regression per row of ``W``, all at once.
+
+    All fits share the design ``X`` (n, p); iterations start from ``start``
+    (e.g. the full-sample fit) when given. Returns ``(coef, converged)``
+    with shapes ``(B, p)`` and ``(B,)``.
+    """
+    n, p = X.shape
+    # Each observation's x x^T, so the B information matrices are one product
+    outer = (X[:, :, None] * X[:, None, :]).reshape(n, p * p)
+    beta = np.zeros((len(W), p)) if start is None else np.tile(start, (len(W), 1))
+    step = np.full_like(beta, np.inf)
+    with np.errstate(over="ignore"):
+        for _ in range(max_iter):
+            # In place: these are (B, n) arrays and temporaries dominate the cost
+            eta = beta @ X.T
+            mu = np.exp(np.negative(eta, out=eta), out=eta)
+            mu += 1.0
+            np.reciprocal(mu, out=mu)
+            resid = np.subtract(y, mu)
+            v = np.subtract(1.0, mu, out=mu)
+            v *= W
+            v *= y - resid
+            resid *= W
+            info = (v @ outer).reshape(-1, p, p)
+            score = (resid @ X)[..., None]
+            try:
+                step = np.linalg.solve(info, score)[..., 0]
+            except np.linalg.LinAlgError:
+                step = (np.linalg.pinv(info) @ score)[..., 0]
+            beta += step
+            if np.max(np.abs(step)) < tol:
+                break
+    converged = (np.abs(step) < tol).all(axis=1) & np.isfinite(beta).all(axis=1)
+    return beta, converged
+
+
+@dataclass(frozen=True)
+class LogitFit:
+    terms: tuple
+    names: tuple
+    coef: np.ndarray
+    se: np.ndarray
+    n: int
+    iterations: int
+    converged: bool
+
+    def table(self):
+        """Coefficients with odds ratios, 95% Wald intervals and p-values."""
+        z = self.coef / self.se
+        p = [math.erfc(abs(v) / math.sqrt(2)) for v in z]
+        return pd.DataFrame(
+            {
+                "Estimate": self.coef,
+                "Std. Error": self.se,
+                "Odds ratio": np.exp(self.coef),
+                "2.5%": np.exp(self.coef - Z_95 * self.se),
+                "97.5%": np.exp(self.coef + Z_95 * self.se),
+                "p-value": p,
+            },
+            index=pd.Index(self.names, name="Term"),
+        )
+
+
+class GSSModels:
+    """Recoded GSS rows and memoized fits over any set of ``TERMS``."""
+
+    def __init__(self, gss, cache_size=64):
+        self.columns, self.y, self.weight = _recode(gss)
+        self.fit = lru_cache(maxsize=cache_size)(self._fit)
+
+    def design(self, terms):
+        """``(X, y, w, names)`` for ``terms``, over complete cases only."""
+        names = [col for term in terms for col in TERMS[term]]
+        X = np.column_stack([np.ones_like(self.y)] + [self.columns[col] for col in names])
+        complete = np.isfinite(X).all(axis=1)
+        w = self.weight[complete]
+        # Rescale to mean 1 so the information matrix counts respondents
+        if len(w):
+            w = w / w.mean()
+        return X[complete], self.y[complete], w, ("(Intercept)", *names)
+
+    def _fit(self, terms):
+        X, y, w, names = self.design(terms)
+        coef, cov, iterations, converged = fit_logit(X, y, w)
+        se = np.sqrt(np.diag(cov))
+        # Cached fits are shared by every session
+        coef.setflags(write=False)
+        se.setflags(write=False)
+        return LogitFit(terms, names, coef, se, len(y), iterations, converged)
+
+    def fit_terms(self, terms):
+        """Fit ``terms`` in ``TERMS`` order, so any ordering shares a cache entry."""
+        return self.fit(tuple(term for term in TERMS if term in terms))
+
+
+_lock = threading.Lock()
+_cached = {}  # (path, mtime_ns) -> GSSModels
+
+
+def load_models(path=None):
+    """``GSSModels`` for the extract, read once per process (until it changes)."""
+    path = Path(path) if path is not None else extract_path()
+    if path is None:
+        raise FileNotFoundError(f"no GSS extract at {GSS_EXTRACT}")
+    key = (str(path.resolve()), path.stat().st_mtime_ns)
+    with _lock:
+        if key not in _cached:
+            _cached.clear()
+            _cached[key] = GSSModels(read_extract(path))
+        return _cached[key]
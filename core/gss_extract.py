@@ -0,0 +1,18 @@
+"""Location of the local GSS extract, importable without NumPy or pandas.
+
+The GSS Happiness page checks for the extract on every run. Keeping that
+check here means a deployment without an extract never imports ``core.gss``
+or ``core.resampling``, and so never loads NumPy or pandas for the page.
+"""
+
+import os
+from pathlib import Path
+
+GSS_EXTRACT = Path(__file__).resolve().parent.parent / "assets" / "gss_happiness.csv"
+VARIABLES = ("year", "happy", "partyid", "age", "race", "sex", "marital", "hapmar", "wtssnrps")
+
+
+def extract_path():
+    """The GSS extract to use, or None if there isn't one."""
+    path = Path(os.environ.get("APP_GSS_EXTRACT", GSS_EXTRACT))
+    return path if path.exists() else None
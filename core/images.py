@@ -0,0 +1,158 @@
+"""Local image assets, pre-resized at build time and cached in memory.
+
+The pages used to hot-link every figure from raw.githubusercontent.com, so
+each view cost a round trip to a third-party host and broke without network
+access. ``python -m core.images`` resizes each PNG in ``assets/`` to the width
+the pages display it at and writes it under a content-hashed name recorded in
+a manifest. ``show_image()`` serves those bytes from an in-process cache, so
+rendering a page never touches the network or decodes a full-size image.
+Cache entries are keyed on the mtimes of the source image and the manifest,
+so a replaced image or a rebuild is picked up without a restart.
+
+Variants stay PNG: ``st.image`` only passes PNG and JPEG bytes through, and
+would decode and re-encode anything else (e.g. WebP) on every render.
+"""
+
+import hashlib
+import io
+import json
+import threading
+from pathlib import Path
+
+import streamlit as st
+
+from core.instrument import register_gauge
+
+ASSETS_DIR = Path(__file__).resolve().parent.parent / "assets"
+BUILD_DIR = ASSETS_DIR / "build"
+MANIFEST = BUILD_DIR / "manifest.json"
+
+# Only used when an image is not in assets/ (the headshot is not checked in)
+REMOTE_BASE = "https://raw.githubusercontent.com/ChristiannaLindsay/streamlit_website/main/assets/"
+
+# Every (image, display width) the pages use
+VARIANTS = (
+    ("headshot.png", 280),
+    ("Model1.png", 500),
+    ("Model2.png", 500),
+    ("Model3.png", 500),
+    ("odds_ratios.png", 600),
+    ("married.png", 500),
+    ("happily_married.png", 500),
+)
+
+_lock = threading.Lock()
+_bytes = {}  # (name, width) -> ((source mtime_ns, manifest mtime_ns), bytes or remote URL)
+_manifest = (None, {})  # (manifest mtime_ns, entries)
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _variant_key(name, width):
+    return f"{name}@{width}"
+
+
+def build_variant(name, width):
+    """Resize ``assets/<name>`` to ``width`` px and write it under a hashed name."""
+    from PIL import Image
+
+    source = (ASSETS_DIR / name).read_bytes()
+    with Image.open(io.BytesIO(source)) as img:
+        img = img.convert("RGBA")
+        if img.width > width:
+            img = img.resize((width, round(img.height * width / img.width)), Image.LANCZOS)
+        # The figures are flat-colour tables and charts; a palette keeps the
+        # resampled edges from bloating the file
+        img = img.quantize(256, method=Image.Quantize.FASTOCTREE)
+        out = io.BytesIO()
+        img.save(out, format="PNG", optimize=True)
+    data = out.getvalue()
+    path = BUILD_DIR / f"{Path(name).stem}.{width}.{_sha256(data)[:12]}.png"
+    path.write_bytes(data)
+    return {"file": path.name, "source_sha256": _sha256(source)}
+
+
+def build_all():
+    BUILD_DIR.mkdir(exist_ok=True)
+    manifest = {}
+    for name, width in VARIANTS:
+        if (ASSETS_DIR / name).exists():
+            manifest[_variant_key(name, width)] = build_variant(name, width)
+    keep = {entry["file"] for entry in manifest.values()}
+    for old in BUILD_DIR.glob("*.png"):
+        if old.name not in keep:
+            old.unlink()
+    MANIFEST.write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+def _mtime(path):
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _load_manifest(mtime):
+    global _manifest
+    if _manifest[0] != mtime:
+        try:
+            entries = json.loads(MANIFEST.read_text())
+        except (OSError, ValueError):
+            entries = {}
+        _manifest = (mtime, entries)
+    return _manifest[1]
+
+
+def image_bytes(name, width):
+    """Bytes to display ``name`` at ``width``, or a URL if it isn't local.
+
+    Prefers the built variant; falls back to the original file when the
+    variant is missing or was built from a different version of the source.
+    """
+    key = (name, width)
+    source_path = ASSETS_DIR / name
+    version = (_mtime(source_path), _mtime(MANIFEST))
+    with _lock:
+        cached = _bytes.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        if version[0] is None:
+            data = REMOTE_BASE + name
+        else:
+            source = source_path.read_bytes()
+            entry = _load_manifest(version[1]).get(_variant_key(name, width))
+            data = source
+            if entry is not None and entry["source_sha256"] == _sha256(source):
+                variant = BUILD_DIR / entry["file"]
+                if variant.exists():
+                    data = variant.read_bytes()
+        _bytes[key] = (version, data)
+        return data
+
+
+def show_image(name, width):
+    # An image already at ``width`` in PNG is passed through without decoding
+    st.image(image_bytes(name, width), width=width, output_format="PNG")
+
+
+def warm_cache():
+    for name, width in VARIANTS:
+        image_bytes(name, width)
+
+
+def cache_info():
+    with _lock:
+        local = [data for _, data in _bytes.values() if isinstance(data, bytes)]
+        return {"entries": len(_bytes), "bytes": sum(len(v) for v in local)}
+
+
+register_gauge("image_cache_entries", lambda: cache_info()["entries"])
+register_gauge("image_cache_bytes", lambda: cache_info()["bytes"])
+
+
+if __name__ == "__main__":
+    for key, entry in build_all().items():
+        print(f"{key} -> {entry['file']}")
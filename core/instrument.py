@@ -0,0 +1,217 @@
+"""Lightweight stage timers and counters for the app's hot paths.
+
+Wrap a stage in ``with stage("name"):`` to record its wall time (and, when
+``APP_TRACE_ALLOC=1``, its peak Python allocations) in a process-wide
+registry. tracemalloc is process-wide too, so traced stages take turns:
+concurrent sessions wait for each other while allocation tracing is on.
+``count()`` bumps a counter. The registry can be read as a dict, as
+Prometheus text via ``prometheus_text()`` or ``start_metrics_server()``,
+and each stage is also logged as one JSON line on the ``app.timing`` logger.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger("app.timing")
+
+TRACE_ALLOC = os.environ.get("APP_TRACE_ALLOC") == "1"
+
+
+@dataclass
+class StageStats:
+    count: int = 0
+    total_s: float = 0.0
+    max_s: float = 0.0
+    last_s: float = 0.0
+    peak_alloc_bytes: int = 0
+
+
+_lock = threading.Lock()
+_stages = {}
+_counters = {}
+_gauges = {}  # name -> zero-argument callable returning a number
+_server = None
+_trace_lock = threading.Lock()  # held by the one stage being traced
+_local = threading.local()
+
+
+@contextmanager
+def stage(name):
+    """Time the enclosed block and record it under ``name``."""
+    # Allocations are only traced for the outermost stage of a thread;
+    # nested stages report 0 rather than the outer stage's peak
+    tracing = TRACE_ALLOC and not getattr(_local, "tracing", False)
+    if tracing:
+        _trace_lock.acquire()
+        if tracemalloc.is_tracing():  # someone else's tracer (e.g. a benchmark)
+            _trace_lock.release()
+            tracing = False
+        else:
+            _local.tracing = True
+            tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        peak = 0
+        if tracing:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            _local.tracing = False
+            _trace_lock.release()
+        with _lock:
+            stats = _stages.setdefault(name, StageStats())
+            stats.count += 1
+            stats.total_s += elapsed
+            stats.max_s = max(stats.max_s, elapsed)
+            stats.last_s = elapsed
+            stats.peak_alloc_bytes = max(stats.peak_alloc_bytes, peak)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(json.dumps({"stage": name, "ms": round(elapsed * 1000, 3),
+                                     "peak_alloc_bytes": peak}))
+
+
+def count(name, n=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def register_gauge(name, read):
+    """Report ``read()`` under ``name`` whenever metrics are exported."""
+    with _lock:
+        _gauges[name] = read
+
+
+def snapshot():
+    """Plain-dict copy of every stage, counter and gauge."""
+    with _lock:
+        stages = {name: vars(stats).copy() for name, stats in _stages.items()}
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+    return {
+        "stages": stages,
+        "counters": counters,
+        "gauges": {name: read() for name, read in gauges.items()},
+    }
+
+
+def _metric_name(name):
+    return "".join(c if c.isalnum() else "_" for c in name).strip("_").lower()
+
+
+def prometheus_text():
+    """The registry in the Prometheus text exposition format."""
+    snap = snapshot()
+    lines = [
+        "# TYPE app_stage_seconds_total counter",
+        "# TYPE app_stage_calls_total counter",
+        "# TYPE app_stage_max_seconds gauge",
+        "# TYPE app_stage_peak_alloc_bytes gauge",
+    ]
+    for name, s in sorted(snap["stages"].items()):
+        label = f'{{stage="{name}"}}'
+        lines += [
+            f"app_stage_seconds_total{label} {s['total_s']:.6f}",
+            f"app_stage_calls_total{label} {s['count']}",
+            f"app_stage_max_seconds{label} {s['max_s']:.6f}",
+            f"app_stage_peak_alloc_bytes{label} {s['peak_alloc_bytes']}",
+        ]
+    for name, value in sorted(snap["counters"].items()):
+        metric = f"app_{_metric_name(name)}_total"
+        lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+    for name, value in sorted(snap["gauges"].items()):
+        metric = f"app_{_metric_name(name)}"
+        lines += [f"# TYPE {metric} gauge", f"{metric} {value}"]
+    return "\n".join(lines) + "\n"
+
+
+def _metrics_route():
+    return 200, "text/plain; version=0.0.4", prometheus_text()
+
+
+# path -> zero-argument callable returning (status, content type, body)
+_routes = {"/metrics": _metrics_route}
+
+
+def add_route(path, handler):
+    """Serve ``handler()`` at ``path`` on the metrics server."""
+    with _lock:
+        _routes[path] = handler
+
+
+# title -> zero-argument callable that renders into the admin sidebar
+_panels = {}
+
+
+def add_panel(title, render):
+    """Show ``render()`` in its own expander of the admin panel."""
+    with _lock:
+        _panels[title] = render
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        handler = _routes.get(self.path.rstrip("/"))
+        if handler is None:
+            self.send_error(404)
+            return
+        status, content_type, body = handler()
+        body = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_metrics_server(port, host="127.0.0.1"):
+    """Serve ``/metrics`` (and added routes) on a daemon thread.
+
+    Later calls are no-ops.
+    """
+    global _server
+    with _lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+    return _server
+
+
+def admin_panel():
+    """Sidebar timing panel, shown only to ``?admin=<APP_ADMIN_TOKEN>``."""
+    import streamlit as st
+
+    token = os.environ.get("APP_ADMIN_TOKEN")
+    if not token or st.query_params.get("admin") != token:
+        return
+    snap = snapshot()
+    with st.sidebar.expander("Timings", expanded=False):
+        rows = [
+            {
+                "stage": name,
+                "calls": s["count"],
+                "mean ms": round(s["total_s"] / s["count"] * 1000, 2),
+                "max ms": round(s["max_s"] * 1000, 2),
+                "last ms": round(s["last_s"] * 1000, 2),
+                "peak alloc KB": round(s["peak_alloc_bytes"] / 1024, 1),
+            }
+            for name, s in sorted(snap["stages"].items())
+        ]
+        st.dataframe(rows, hide_index=True)
+        st.json({**snap["counters"], **snap["gauges"]})
+    with _lock:
+        panels = list(_panels.items())
+    for title, render in panels:
+        with st.sidebar.expander(title, expanded=False):
+            render()
@@ -0,0 +1,151 @@
+"""Per-session memory accounting.
+
+Sessions share the cached dataset, its rankings and the filter engines'
+results; what a session owns is its widget state and the rows it pulls out
+of the shared frames to display. A page calls ``begin_run()`` at the top of
+a run, ``account(name, value)`` on every projection it materializes, and
+``end_run()`` at the bottom. ``owned_bytes()`` counts only memory that is
+not shared: the process-wide caches hand out read-only arrays, so a row
+order sliced from the rankings counts for nothing.
+
+The latest run of every live session is kept process-wide and exported as
+gauges, and the admin panel lists the current session's items against
+``BUDGET_BYTES``.
+"""
+
+import sys
+import threading
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from core.instrument import add_panel, register_gauge
+
+BUDGET_BYTES = 4 << 20
+
+
+def owned_bytes(value):
+    """Bytes held by ``value`` that are not shared with the process-wide caches."""
+    if value is None:
+        return 0
+    if isinstance(value, np.ndarray):
+        # Shared arrays (rankings, filter results) are read-only
+        if not value.flags.writeable:
+            return 0
+        size = value.nbytes
+        if value.dtype == object:
+            size += sum(sys.getsizeof(item) for item in value.ravel())
+        return size
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(value, pd.DataFrame) else usage)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(owned_bytes(k) + owned_bytes(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(owned_bytes(item) for item in value)
+    return sys.getsizeof(value)
+
+
+@dataclass
+class Footprint:
+    """What one session's latest run holds, in bytes per item."""
+
+    items: dict = field(default_factory=dict)
+    state: int = 0
+
+    @property
+    def total(self):
+        return self.state + sum(self.items.values())
+
+
+_lock = threading.Lock()
+_sessions = {}  # session id -> Footprint of its latest finished run
+_running = {}  # session id -> Footprint of the run in progress
+
+
+def _session_id():
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return None if ctx is None else ctx.session_id
+
+
+def begin_run():
+    """Start accounting the current session's run."""
+    session = _session_id()
+    if session is not None:
+        with _lock:
+            _running[session] = Footprint()
+
+
+def account(name, value):
+    """Charge ``value`` to the current session's run as ``name``; returns ``value``."""
+    session = _session_id()
+    with _lock:
+        footprint = _running.get(session)
+    if footprint is not None:
+        footprint.items[name] = footprint.items.get(name, 0) + owned_bytes(value)
+    return value
+
+
+def _prune():
+    from streamlit.runtime import Runtime
+
+    if not Runtime.exists():
+        return
+    runtime = Runtime.instance()
+    for ledger in (_sessions, _running):
+        for session in [s for s in ledger if not runtime.is_active_session(s)]:
+            del ledger[session]
+
+
+def end_run():
+    """Add the session state to the run's footprint and publish it."""
+    import streamlit as st
+
+    session = _session_id()
+    with _lock:
+        footprint = _running.pop(session, None)
+    if footprint is None:
+        return
+    footprint.state = sum(owned_bytes(key) + owned_bytes(value)
+                          for key, value in st.session_state.to_dict().items())
+    with _lock:
+        _sessions[session] = footprint
+        _prune()
+
+
+def footprints():
+    """``{session id: Footprint}`` of every live session's latest run."""
+    with _lock:
+        return dict(_sessions)
+
+
+def _totals():
+    with _lock:
+        return [footprint.total for footprint in _sessions.values()]
+
+
+def _panel():
+    import streamlit as st
+
+    footprint = footprints().get(_session_id())
+    totals = _totals()
+    if footprint is not None:
+        rows = [{"item": name, "KB": round(size / 1024, 1)}
+                for name, size in sorted(footprint.items.items(), key=lambda item: -item[1])]
+        rows.append({"item": "session state", "KB": round(footprint.state / 1024, 1)})
+        st.dataframe(rows, hide_index=True)
+        st.caption(f"This session: {footprint.total / 1024:.1f} KB of a "
+                   f"{BUDGET_BYTES / 1024:.0f} KB budget")
+    if totals:
+        st.caption(f"{len(totals)} sessions: {sum(totals) / 1024:.1f} KB in total, "
+                   f"largest {max(totals) / 1024:.1f} KB")
+
+
+register_gauge("sessions_accounted", lambda: len(_totals()))
+register_gauge("session_footprint_bytes_total", lambda: sum(_totals()))
+register_gauge("session_footprint_bytes_max", lambda: max(_totals(), default=0))
+register_gauge("sessions_over_budget", lambda: sum(total > BUDGET_BYTES for total in _totals()))
+add_panel("Session memory", _panel)
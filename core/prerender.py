@@ -0,0 +1,330 @@
+"""Pre-rendered snapshots of the pages' static sections.
+
+Most of the About Me and GSS pages, and the prose of the Nutrition Tool,
+have no inputs, yet every visit re-ran them and rebuilt the same element
+tree, including one image element per figure. A page marks such a block
+with ``static_section``:
+
+    with static_section(__file__, "intro") as cached:
+        if not cached:
+            st.title(...)
+
+``python -m core.prerender`` runs every page headless, records what each
+section renders and writes it under ``assets/build/pages/`` as a short list
+of parts: markdown documents, the figures between them and the column
+layouts that hold figures. At run time a section with a fresh snapshot
+replays those parts, one ``st.markdown`` per run of text and one
+``show_image`` per figure, so the browser still caches the images, and its
+body is skipped. A snapshot is fresh while the source of its ``with`` block
+and the images it shows are unchanged; otherwise the section renders live
+as before.
+"""
+
+import ast
+import hashlib
+import html
+import json
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import streamlit as st
+
+from core.images import ASSETS_DIR, BUILD_DIR, show_image
+from core.instrument import count
+
+ROOT = ASSETS_DIR.parent
+SNAPSHOT_DIR = BUILD_DIR / "pages"
+MANIFEST = SNAPSHOT_DIR / "manifest.json"
+PAGES = ("views/about_me.py", "views/project1.py", "views/project2.py")
+
+_START, _END, _IMAGE = "<!--section:", "<!--end:", "<!--image:"
+
+_lock = threading.Lock()
+_recording = False
+_manifest = None
+_manifest_mtime = None
+_bodies = {}  # section -> parts
+_hashes = {}  # (path, mtime_ns) -> sha256
+_sources = {}  # (path, mtime_ns) -> {section name: sha256 of its with block}
+
+
+def _file_sha256(path):
+    path = Path(path)
+    key = (str(path), path.stat().st_mtime_ns)
+    with _lock:
+        if key not in _hashes:
+            _hashes[key] = hashlib.sha256(path.read_bytes()).hexdigest()
+        return _hashes[key]
+
+
+def _section_name(expr):
+    """The literal section name of a ``static_section(...)`` call, else None."""
+    func = getattr(expr, "func", None)
+    if getattr(func, "id", getattr(func, "attr", None)) != "static_section":
+        return None
+    name = expr.args[1] if len(expr.args) > 1 else None
+    for keyword in expr.keywords:
+        if keyword.arg == "name":
+            name = keyword.value
+    return name.value if isinstance(name, ast.Constant) else None
+
+
+def _block_sha256(script, name):
+    """Hash of the ``with static_section(__file__, name)`` block in ``script``."""
+    path = Path(script)
+    key = (str(path), path.stat().st_mtime_ns)
+    with _lock:
+        if key not in _sources:
+            source = path.read_text()
+            blocks = {}
+            for node in ast.walk(ast.parse(source)):
+                if not isinstance(node, ast.With):
+                    continue
+                for item in node.items:
+                    block = _section_name(item.context_expr)
+                    if block is not None:
+                        text = ast.get_source_segment(source, node)
+                        blocks[block] = hashlib.sha256(text.encode()).hexdigest()
+            _sources[key] = blocks
+        return _sources[key].get(name)
+
+
+def _inputs(script, section, images):
+    """Hashes of everything a section's snapshot was rendered from."""
+    inputs = {"source": _block_sha256(script, section.rsplit(".", 1)[1])}
+    for name in images:
+        path = ASSETS_DIR / name
+        inputs[name] = _file_sha256(path) if path.exists() else None
+    return inputs
+
+
+def _load_manifest():
+    global _manifest, _manifest_mtime
+    try:
+        mtime = MANIFEST.stat().st_mtime_ns
+    except OSError:
+        mtime = None
+    with _lock:
+        if mtime != _manifest_mtime:
+            try:
+                _manifest = json.loads(MANIFEST.read_text())
+            except (OSError, ValueError):
+                _manifest = {}
+            _manifest_mtime = mtime
+            _bodies.clear()
+        return _manifest
+
+
+def snapshot(script, section):
+    """The fresh pre-rendered parts of ``section``, or None."""
+    entry = _load_manifest().get(section)
+    if entry is None or _inputs(script, section, entry["images"]) != entry["inputs"]:
+        return None
+    with _lock:
+        if section not in _bodies:
+            try:
+                _bodies[section] = json.loads((SNAPSHOT_DIR / entry["file"]).read_text())
+            except (OSError, ValueError):
+                return None
+        return _bodies[section]
+
+
+def _replay(parts):
+    for part in parts:
+        if "markdown" in part:
+            st.markdown(part["markdown"], unsafe_allow_html=True)
+        elif "image" in part:
+            show_image(part["image"], part["width"])
+        else:
+            columns = st.columns(part["columns"], gap=part["gap"],
+                                 vertical_alignment=part["vertical_alignment"])
+            for column, cell in zip(columns, part["cells"]):
+                with column:
+                    _replay(cell)
+
+
+def _section(script, name):
+    return f"{Path(script).stem}.{name}"
+
+
+@contextmanager
+def static_section(script, name):
+    """Serve the block's snapshot when there is a fresh one; yields whether it did."""
+    section = _section(script, name)
+    if _recording:
+        st.markdown(f"{_START}{section}-->", unsafe_allow_html=True)
+        yield False
+        st.markdown(f"{_END}{section}-->", unsafe_allow_html=True)
+        return
+    body = snapshot(script, section)
+    if body is None:
+        yield False
+        return
+    count("static_section_hits")
+    _replay(body)
+    yield True
+
+
+def warm():
+    """Read every fresh snapshot into memory."""
+    for section, entry in _load_manifest().items():
+        snapshot(ROOT / entry["script"], section)
+
+
+# Rendering recorded element trees to parts
+
+def _image_marker(name, width):
+    st.markdown(f"{_IMAGE}{name}:{width}-->", unsafe_allow_html=True)
+
+
+def _image_ref(node):
+    """``(name, width)`` if ``node`` is a recorded ``show_image`` call."""
+    if getattr(node, "type", None) != "markdown" or not node.proto.body.startswith(_IMAGE):
+        return None
+    name, width = node.proto.body[len(_IMAGE):-3].rsplit(":", 1)
+    return name, int(width)
+
+
+def _has_image(node):
+    return _image_ref(node) is not None or any(
+        _has_image(child) for child in getattr(node, "children", {}).values())
+
+
+def _enum_name(message, field):
+    return message.DESCRIPTOR.fields_by_name[field].enum_type.values_by_number[
+        getattr(message, field)].name.lower()
+
+
+def _markdown(proto):
+    body = proto.body
+    if not body.strip():
+        return "&nbsp;"
+    if not proto.allow_html:
+        body = body.replace("<", "&lt;")
+    if proto.element_type == proto.Type.CAPTION:
+        return f'<p style="font-size:14px;opacity:0.6">{body}</p>'
+    return body
+
+
+def _render(node):
+    """Markdown for an element tree that holds no figures."""
+    kind = getattr(node, "type", None)
+    if kind in ("title", "header", "subheader"):
+        return f"<{node.proto.tag}>{html.escape(node.proto.body)}</{node.proto.tag}>"
+    if kind in ("markdown", "caption"):
+        return _markdown(node.proto)
+    if kind == "image":
+        return "\n".join(f'<img src="{img.url}" style="max-width:100%">' for img in node.proto.imgs)
+    if kind == "flex_container":
+        columns = []
+        for column in node.children.values():
+            spec = column.proto
+            align = "center" if spec.vertical_alignment == spec.CENTER else "flex-start"
+            inner = "\n\n".join(_render(child) for child in column.children.values())
+            # Blank lines around the inner markdown so it is parsed as markdown
+            columns.append(f'<div style="flex:{spec.weight};align-self:{align}">'
+                           f"\n\n{inner}\n\n</div>")
+        return '<div style="display:flex;gap:1rem">\n' + "\n".join(columns) + "\n</div>"
+    raise ValueError(f"{type(node).__name__} ({kind}) can't be pre-rendered")
+
+
+def _parts(nodes, images):
+    """``nodes`` as replayable parts, with consecutive text joined into one document."""
+    parts, text = [], []
+
+    def flush():
+        if text:
+            parts.append({"markdown": "\n\n".join(text)})
+            text.clear()
+
+    for node in nodes:
+        ref = _image_ref(node)
+        if ref is not None:
+            flush()
+            images.append(ref[0])
+            parts.append({"image": ref[0], "width": ref[1]})
+        elif getattr(node, "type", None) == "flex_container" and _has_image(node):
+            flush()
+            columns = list(node.children.values())
+            gap = _enum_name(node.proto.flex_container.gap_config, "gap_size")
+            parts.append({
+                "columns": [column.proto.weight for column in columns],
+                "gap": None if gap == "none" else gap,
+                "vertical_alignment": _enum_name(columns[0].proto, "vertical_alignment"),
+                "cells": [_parts(column.children.values(), images) for column in columns],
+            })
+        else:
+            text.append(_render(node))
+    flush()
+    return parts
+
+
+def _sections(main):
+    """``{section: [top-level nodes]}`` between the recorded markers."""
+    sections, current = {}, None
+    for node in main.children.values():
+        body = node.proto.body if getattr(node, "type", None) == "markdown" else ""
+        if body.startswith(_START):
+            current = body[len(_START):-3]
+            sections[current] = []
+        elif body.startswith(_END):
+            current = None
+        elif current is not None:
+            sections[current].append(node)
+    return sections
+
+
+def build(pages=PAGES):
+    """Render every page's static sections to ``SNAPSHOT_DIR``; returns the manifest."""
+    global _recording
+    from streamlit.testing.v1 import AppTest
+
+    from core import images as image_module
+
+    SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+    manifest = {}
+    show_image = image_module.show_image
+    image_module.show_image = _image_marker
+    _recording = True
+    try:
+        for script in pages:
+            at = AppTest.from_file(str(ROOT / script), default_timeout=120).run()
+            if at.exception:
+                raise RuntimeError(f"{script} raised: {[e.value for e in at.exception]}")
+            for section, nodes in _sections(at.main).items():
+                images = []
+                parts = _parts(nodes, images)
+                name = f"{section}.json"
+                (SNAPSHOT_DIR / name).write_text(json.dumps(parts))
+                manifest[section] = {
+                    "file": name,
+                    "script": script,
+                    "images": images,
+                    "inputs": _inputs(ROOT / script, section, images),
+                }
+    finally:
+        _recording = False
+        image_module.show_image = show_image
+    keep = {entry["file"] for entry in manifest.values()}
+    for old in SNAPSHOT_DIR.glob("*.*"):
+        if old.name not in keep and old != MANIFEST:
+            old.unlink()
+    MANIFEST.write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+def main():
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    # Under ``python -m`` this module is __main__; the pages import (and
+    # check the recording flag of) core.prerender
+    from core import prerender
+
+    for section, entry in prerender.build().items():
+        print(f"{section} -> {entry['file']} ({len(entry['images'])} images)")
+
+
+if __name__ == "__main__":
+    main()
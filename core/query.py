@@ -0,0 +1,117 @@
+"""Compound nutrient filters evaluated as bitmap operations.
+
+Filters like "Magnesium PDV >= 20 AND Sodium PDV <= 5 AND food code prefix
+not 71" are re-evaluated on every slider move. ``QueryEngine`` precomputes,
+for every numeric column, its sorted order and a bitmap of the rows at or
+above each quantile cut. A range predicate is then one precomputed bitmap
+plus the few rows between the threshold and the nearest cut. Predicates are
+combined with bitwise AND on ``uint64`` words, and no boolean Series or
+frame copies are built.
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+from types import MappingProxyType
+
+import numpy as np
+
+from core.rankings import ID_COLUMNS
+
+QUANTILES = 32
+CODE_COLUMN = "Food code"
+CATEGORY_COLUMN = "WWEIA Category description"
+
+# op is ">=", "<=" or "between" (value is then a (low, high) pair)
+Predicate = namedtuple("Predicate", "column op value")
+
+
+def _bits(positions, n):
+    mask = np.zeros(-(-n // 64) * 64, dtype=bool)
+    mask[positions] = True
+    return np.packbits(mask, bitorder="little").view(np.uint64)
+
+
+def positions_of(bitmap, n):
+    """Row positions set in ``bitmap``."""
+    return np.flatnonzero(np.unpackbits(bitmap.view(np.uint8), bitorder="little")[:n])
+
+
+class _Column:
+    def __init__(self, values, n):
+        valid = np.flatnonzero(np.isfinite(values))
+        order = valid[np.argsort(values[valid], kind="stable")]
+        self.n = n
+        self.order = order
+        self.sorted = values[order]
+        self.valid = _bits(order, n)
+        # suffix[k]: rows whose rank is >= cuts[k]
+        self.cuts = np.unique(np.linspace(0, len(order), QUANTILES + 1).astype(np.int64))
+        self.suffix = [_bits(order[cut:], n) for cut in self.cuts]
+
+    def rank_suffix(self, rank):
+        """Bitmap of rows whose rank is >= ``rank``."""
+        k = np.searchsorted(self.cuts, rank)
+        if k == len(self.cuts):
+            return np.zeros_like(self.valid)
+        # Nearest precomputed cut at or above ``rank``, plus the boundary rows
+        return self.suffix[k] | _bits(self.order[rank:self.cuts[k]], self.n)
+
+    def at_least(self, value):
+        return self.rank_suffix(np.searchsorted(self.sorted, value, side="left"))
+
+    def at_most(self, value):
+        return self.valid & ~self.rank_suffix(np.searchsorted(self.sorted, value, side="right"))
+
+
+class QueryEngine:
+    """Bitmap-backed range and food-group filters over ``frame``."""
+
+    def __init__(self, frame, cache_size=256):
+        self.n = len(frame)
+        self.columns = tuple(col for col in frame.select_dtypes("number").columns
+                             if col not in ID_COLUMNS)
+        values = frame[list(self.columns)].to_numpy(dtype=np.float64)
+        self._columns = {col: _Column(values[:, i], self.n) for i, col in enumerate(self.columns)}
+        self.all = _bits(np.arange(self.n), self.n)
+        self.all.flags.writeable = False
+
+        prefixes = frame[CODE_COLUMN].astype(str).str[:2].to_numpy()
+        self._prefix = {p: _bits(np.flatnonzero(prefixes == p), self.n) for p in np.unique(prefixes)}
+        # Label each food-code prefix with its most common category
+        categories = frame[CATEGORY_COLUMN].astype(str).to_numpy()
+        labels = {}
+        for p in self._prefix:
+            names, counts = np.unique(categories[prefixes == p], return_counts=True)
+            labels[p] = names[np.argmax(counts)]
+        self.prefix_labels = MappingProxyType(labels)
+
+        self.evaluate = lru_cache(maxsize=cache_size)(self._evaluate)
+
+    def bounds(self, column):
+        """``(min, max)`` of the finite values in ``column``."""
+        col = self._columns[column]
+        if not len(col.sorted):
+            return 0.0, 0.0
+        return float(col.sorted[0]), float(col.sorted[-1])
+
+    def predicate(self, pred):
+        col = self._columns[pred.column]
+        if pred.op == ">=":
+            return col.at_least(pred.value)
+        if pred.op == "<=":
+            return col.at_most(pred.value)
+        if pred.op == "between":
+            low, high = pred.value
+            return col.at_least(low) & col.at_most(high)
+        raise ValueError(f"unknown operator {pred.op!r}")
+
+    def _evaluate(self, predicates=(), exclude_prefixes=()):
+        bitmap = self.all.copy()
+        for pred in predicates:
+            bitmap &= self.predicate(pred)
+        for p in exclude_prefixes:
+            if p in self._prefix:
+                bitmap &= ~self._prefix[p]
+        result = positions_of(bitmap, self.n)
+        result.flags.writeable = False
+        return result
@@ -0,0 +1,53 @@
+"""Precomputed per-nutrient rankings of the cleaned FNDDS table.
+
+The Interactive Nutrient Tool used to sort a copy of the whole table every
+time the Nutrient or Number of foods input changed. ``NutrientRankings``
+argsorts every numeric column once, highest-first and lowest-first, both per
+100 g and per kcal, so a top-N query is just a slice of a stored order.
+"""
+
+import numpy as np
+
+ENERGY_COLUMN = "Energy (kcal)"
+ID_COLUMNS = ("Food code", "WWEIA Category number")
+
+
+def _stable_order(values, descending):
+    # Missing values always rank last, ties keep table order
+    values = np.where(np.isfinite(values), values, np.nan)
+    order = np.argsort(-values if descending else values, axis=0, kind="stable")
+    # One contiguous row of positions per column
+    order = np.ascontiguousarray(order.T, dtype=np.int32)
+    order.flags.writeable = False
+    return order
+
+
+class NutrientRankings:
+    """Row orders for every numeric column of ``frame``."""
+
+    def __init__(self, frame):
+        self.columns = tuple(
+            col for col in frame.select_dtypes("number").columns
+            if col not in ID_COLUMNS
+        )
+        self._position = {col: i for i, col in enumerate(self.columns)}
+
+        values = frame[list(self.columns)].to_numpy(dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            per_kcal = values / frame[ENERGY_COLUMN].to_numpy(dtype=np.float64)[:, None]
+
+        self._orders = {
+            (False, False): _stable_order(values, descending=True),
+            (True, False): _stable_order(values, descending=False),
+            (False, True): _stable_order(per_kcal, descending=True),
+            (True, True): _stable_order(per_kcal, descending=False),
+        }
+
+    def positions(self, column, n=None, ascending=False, per_kcal=False):
+        """Row positions of the ``n`` foods highest (or lowest) in ``column``.
+
+        ``per_kcal`` ranks on ``column`` divided by energy; foods with no
+        energy rank last.
+        """
+        order = self._orders[(ascending, per_kcal)]
+        return order[self._position[column], :n]
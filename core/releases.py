@@ -0,0 +1,167 @@
+"""Side-by-side FNDDS releases and the differences between them.
+
+Each release CSV is streamed in chunks with explicit dtypes. Headers are
+normalized, and every chunk is cleaned and %DV-augmented before the next one
+is read, so peak memory is one raw chunk plus the (small) cleaned output and
+the code and description of every food, however many releases are loaded.
+``ReleaseSet`` keeps a food-code-keyed join index across releases, so "what
+changed" questions are array lookups rather than merges on every rerun.
+Foods added and removed are counted over every food in a release; foods the
+cleaning rules keep in one release but drop in the other are reported apart.
+"""
+
+import csv
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from core.daily_values import with_profile
+from core.dataset import ASSETS_DIR
+from core.rules import apply_rules
+from core.similarity import nutrient_columns
+
+# Release label -> CSV in assets/. Releases whose file is missing are skipped.
+RELEASES = {
+    "2017-2018": "FNDDS Nutrient Values 2017-2018.csv",
+    "2019-2020": "FNDDS Nutrient Values.csv",
+    "2021-2023": "FNDDS Nutrient Values 2021-2023.csv",
+}
+
+CHUNK_ROWS = 1000
+TEXT_COLUMNS = ("Main food description", "WWEIA Category description")
+INT_COLUMNS = ("Food code", "WWEIA Category number")
+KEY = "Food code"
+FOOD_COLUMNS = (KEY, "Main food description")
+
+
+def _normalize(col):
+    return " ".join(col.split())
+
+
+def _header(path):
+    """``(records to skip, raw header)``; banners before the header vary by release."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for skip, record in enumerate(csv.reader(f)):
+            if record and record[0].strip() == KEY:
+                return skip, record
+            if skip > 10:
+                break
+    raise ValueError(f"{path} has no '{KEY}' header row")
+
+
+def _dtypes(header):
+    dtypes = {}
+    for col in header:
+        name = _normalize(col)
+        if name in INT_COLUMNS:
+            dtypes[col] = "int32"
+        elif name in TEXT_COLUMNS:
+            dtypes[col] = "str"
+        else:
+            dtypes[col] = "float32"
+    return dtypes
+
+
+def read_release(path, chunk_rows=CHUNK_ROWS):
+    """Stream ``path`` and return ``(cleaned table, code and description of every food)``."""
+    skip, header = _header(path)
+    reader = pd.read_csv(path, skiprows=range(skip), dtype=_dtypes(header), chunksize=chunk_rows)
+    cleaned, foods = [], []
+    for chunk in reader:
+        chunk.columns = [_normalize(col) for col in chunk.columns]
+        foods.append(chunk[list(FOOD_COLUMNS)])
+        cleaned.append(with_profile(apply_rules(chunk)))
+    return pd.concat(cleaned), pd.concat(foods, ignore_index=True)
+
+
+class ReleaseSet:
+    """Cleaned tables for several releases, joined on food code."""
+
+    def __init__(self, tables, foods):
+        self.labels = list(tables)
+        self.tables = tables
+        # Every food in each release, kept or not by the cleaning rules
+        self.foods = foods
+        # Union of cleaned food codes; _positions[label][i] is the row of
+        # codes[i] in that release's table, or -1 if the release lacks it
+        self.codes = np.unique(np.concatenate([t[KEY].to_numpy() for t in tables.values()]))
+        self._positions = {}
+        for label, table in tables.items():
+            table_codes = table[KEY].to_numpy()
+            if not len(table_codes):
+                # Cleaning kept no rows, so there is nothing to search
+                self._positions[label] = np.full(len(self.codes), -1, dtype=np.intp)
+                continue
+            order = np.argsort(table_codes)
+            found = np.searchsorted(table_codes, self.codes, sorter=order)
+            found = np.minimum(found, len(order) - 1)
+            rows = order[found]
+            self._positions[label] = np.where(table_codes[rows] == self.codes, rows, -1)
+        self.diff = lru_cache(maxsize=32)(self._diff)
+
+    def _diff(self, old, new):
+        """Foods added, removed and changed between releases ``old`` and ``new``.
+
+        Returns ``(added, removed, deltas)``: the foods only in ``new``, the
+        foods only in ``old`` (code and description, whether or not cleaning
+        keeps them), and ``new - old`` for every shared nutrient of every
+        cleaned food in both, indexed by food code.
+        """
+        old_foods, new_foods = self.foods[old], self.foods[new]
+        added = new_foods[~new_foods[KEY].isin(old_foods[KEY])]
+        removed = old_foods[~old_foods[KEY].isin(new_foods[KEY])]
+        a, b = self._positions[old], self._positions[new]
+        both = (a >= 0) & (b >= 0)
+        old_table, new_table = self.tables[old], self.tables[new]
+        columns = [col for col in nutrient_columns(new_table) if col in old_table]
+        delta = (new_table[columns].to_numpy()[b[both]] - old_table[columns].to_numpy()[a[both]])
+        deltas = pd.DataFrame(delta, index=pd.Index(self.codes[both], name=KEY), columns=columns)
+        deltas.insert(0, "Main food description",
+                      new_table["Main food description"].to_numpy()[b[both]])
+        return added, removed, deltas
+
+    def cleaning(self, old, new):
+        """Foods in both releases that the cleaning rules keep in only one.
+
+        Returns ``(kept, dropped)``: cleaned rows of ``new`` for foods that
+        cleaning dropped from ``old``, and cleaned rows of ``old`` for foods
+        it drops from ``new``.
+        """
+        a, b = self._positions[old], self._positions[new]
+        in_both = np.isin(self.codes, self.foods[old][KEY]) & np.isin(self.codes, self.foods[new][KEY])
+        kept = self.tables[new].iloc[b[in_both & (a < 0) & (b >= 0)]]
+        dropped = self.tables[old].iloc[a[in_both & (a >= 0) & (b < 0)]]
+        return kept, dropped
+
+    def changed(self, old, new, tolerance=0.0):
+        """Rows of the ``diff`` deltas where any nutrient moved by more than ``tolerance``."""
+        deltas = self.diff(old, new)[2]
+        values = deltas.drop(columns="Main food description").to_numpy()
+        return deltas[(np.abs(np.nan_to_num(values)) > tolerance).any(axis=1)]
+
+
+_lock = threading.Lock()
+_cached = {}  # ((label, path, mtime_ns), ...) -> ReleaseSet
+
+
+def available_releases(releases=None):
+    releases = RELEASES if releases is None else releases
+    paths = {label: Path(ASSETS_DIR, name) for label, name in releases.items()}
+    return {label: path for label, path in paths.items() if path.exists()}
+
+
+def load_releases(releases=None):
+    """Load every available release once per process (until a file changes)."""
+    paths = available_releases(releases)
+    key = tuple((label, str(path), path.stat().st_mtime_ns) for label, path in paths.items())
+    with _lock:
+        if key not in _cached:
+            tables, foods = {}, {}
+            for label, path in paths.items():
+                tables[label], foods[label] = read_release(path)
+            _cached.clear()
+            _cached[key] = ReleaseSet(tables, foods)
+        return _cached[key]
@@ -0,0 +1,194 @@
+"""Bootstrap and permutation inference for the GSS happiness models.
+
+The odds ratios on the GSS page come with model-based standard errors only.
+``bootstrap()`` refits a model on thousands of weighted resamples, and
+``permutation()`` refits it with one term's columns shuffled across
+respondents. Respondents with the same design row and outcome are
+interchangeable, so a replicate is fitted on the total weight of each
+distinct pattern rather than on every row. Replicates are fitted in blocks
+of ``BLOCK`` with ``fit_logit_batch``, and the blocks are spread over a
+process pool. Every block has its own seed spawned from the run's seed, so
+results do not depend on the number of workers. Finished replicate sets are saved under
+``assets/build/resampling/``, so an identical run is read back from disk.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from core.gss import TERMS, fit_logit, fit_logit_batch
+from core.instrument import stage
+
+VERSION = 1
+BLOCK = 250
+CACHE_DIR = Path(__file__).resolve().parent.parent / "assets" / "build" / "resampling"
+
+
+@dataclass(frozen=True)
+class Replicates:
+    """Coefficients of every replicate refit, next to the original fit's.
+
+    ``permuted`` holds the design columns that were shuffled (empty for a
+    bootstrap). Replicates that did not converge are excluded from the
+    summaries.
+    """
+
+    kind: str
+    names: tuple
+    observed: np.ndarray
+    coef: np.ndarray
+    converged: np.ndarray
+    permuted: tuple = ()
+
+    def summary(self):
+        coef = self.coef[self.converged]
+        observed = pd.Series(self.observed, index=pd.Index(self.names, name="Term"))
+        if self.kind == "bootstrap":
+            low, high = np.percentile(coef, [2.5, 97.5], axis=0)
+            return pd.DataFrame({
+                "Odds ratio": np.exp(observed),
+                "Bootstrap SE": coef.std(axis=0, ddof=1),
+                "2.5%": np.exp(low),
+                "97.5%": np.exp(high),
+            })
+        # Share of shuffles with a coefficient at least as far from zero
+        names = [self.names[i] for i in self.permuted]
+        extreme = np.abs(coef[:, list(self.permuted)]) >= np.abs(self.observed[list(self.permuted)])
+        return pd.DataFrame({
+            "Odds ratio": np.exp(observed[names]),
+            "Permutation p-value": (1 + extreme.sum(axis=0)) / (1 + len(coef)),
+        })
+
+
+def _fit_groups(Xg, yg, groups, weights, start):
+    """Fit each row of ``groups`` (a pattern index per respondent) as one replicate."""
+    size, n = groups.shape
+    offsets = len(yg) * np.arange(size)[:, None]
+    W = np.bincount((groups + offsets).ravel(), weights=weights.ravel(), minlength=size * len(yg))
+    return fit_logit_batch(Xg, yg, W.reshape(size, len(yg)), start)
+
+
+def _bootstrap_block(Xg, yg, group, w, start, seed, size):
+    rng = np.random.default_rng(seed)
+    draws = rng.integers(0, len(group), size=(size, len(group)))
+    return _fit_groups(Xg, yg, group[draws], w[draws], start)
+
+
+def _permutation_block(Xg, yg, fixed, moved, w, start, seed, size):
+    rng = np.random.default_rng(seed)
+    n = len(fixed)
+    orders = rng.permuted(np.broadcast_to(np.arange(n), (size, n)), axis=1)
+    # Respondents keep their weight and fixed pattern; the shuffled columns move
+    groups = fixed * (moved.max() + 1) + moved[orders]
+    return _fit_groups(Xg, yg, groups, np.broadcast_to(w, (size, n)), start)
+
+
+def _bootstrap_patterns(X, y):
+    """Distinct (design row, outcome) patterns and each respondent's pattern."""
+    patterns, group = np.unique(np.column_stack([X, y]), axis=0, return_inverse=True)
+    return patterns[:, :-1], patterns[:, -1], group.ravel()
+
+
+def _permutation_patterns(X, y, permuted):
+    """Every combination of a fixed (design, outcome) pattern with a shuffled one.
+
+    Shuffling only recombines existing patterns, so all replicates share this
+    design and differ only in how much weight each combination gets.
+    """
+    kept = [i for i in range(X.shape[1]) if i not in permuted]
+    fixed_rows, fixed = np.unique(np.column_stack([X[:, kept], y]), axis=0, return_inverse=True)
+    moved_rows, moved = np.unique(X[:, permuted], axis=0, return_inverse=True)
+    Xg = np.empty((len(fixed_rows) * len(moved_rows), X.shape[1]))
+    Xg[:, kept] = np.repeat(fixed_rows[:, :-1], len(moved_rows), axis=0)
+    Xg[:, permuted] = np.tile(moved_rows, (len(fixed_rows), 1))
+    yg = np.repeat(fixed_rows[:, -1], len(moved_rows))
+    return Xg, yg, fixed.ravel(), moved.ravel()
+
+
+_lock = threading.Lock()
+_executors = {}  # workers -> ProcessPoolExecutor
+
+
+def _pool(workers):
+    with _lock:
+        if workers not in _executors:
+            # Spawned rather than forked: the Streamlit server is multi-threaded
+            _executors[workers] = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return _executors[workers]
+
+
+def _cache_path(kind, X, y, w, replicates, seed, permuted):
+    digest = hashlib.sha256()
+    for part in (X, y, w):
+        digest.update(np.ascontiguousarray(part).tobytes())
+    digest.update(repr((VERSION, BLOCK, kind, X.shape, replicates, seed, permuted)).encode())
+    return CACHE_DIR / f"{kind}-{digest.hexdigest()[:24]}.npz"
+
+
+def _run(kind, models, terms, replicates, seed, workers, progress, permuted=()):
+    X, y, w, names = models.design(tuple(term for term in TERMS if term in terms))
+    path = _cache_path(kind, X, y, w, replicates, seed, permuted)
+    if path.exists():
+        with np.load(path) as saved:
+            if progress:
+                progress(replicates, replicates)
+            return Replicates(kind, names, saved["observed"], saved["coef"],
+                              saved["converged"], permuted)
+
+    observed = fit_logit(X, y, w)[0]
+    sizes = [min(BLOCK, replicates - start) for start in range(0, replicates, BLOCK)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if kind == "bootstrap":
+        patterns = _bootstrap_patterns(X, y)
+        jobs = [(_bootstrap_block, *patterns, w, observed, s, size)
+                for s, size in zip(seeds, sizes)]
+    else:
+        patterns = _permutation_patterns(X, y, list(permuted))
+        jobs = [(_permutation_block, *patterns, w, observed, s, size)
+                for s, size in zip(seeds, sizes)]
+
+    blocks = [None] * len(jobs)
+    done = 0
+    workers = os.cpu_count() if workers is None else workers
+    with stage(f"resampling_{kind}"):
+        if workers <= 1:
+            finished = ((i, job[0](*job[1:])) for i, job in enumerate(jobs))
+        else:
+            futures = {_pool(workers).submit(*job): i for i, job in enumerate(jobs)}
+            finished = ((futures[f], f.result()) for f in as_completed(futures))
+        for i, result in finished:
+            blocks[i] = result
+            done += sizes[i]
+            if progress:
+                progress(done, replicates)
+
+    coef = np.concatenate([b[0] for b in blocks])
+    converged = np.concatenate([b[1] for b in blocks])
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp.npz")
+    np.savez(tmp, observed=observed, coef=coef, converged=converged)
+    os.replace(tmp, path)
+    return Replicates(kind, names, observed, coef, converged, permuted)
+
+
+def bootstrap(models, terms, replicates=1000, seed=0, workers=None, progress=None):
+    """Weighted bootstrap of the model with ``terms``.
+
+    ``progress(done, total)`` is called as blocks finish.
+    """
+    return _run("bootstrap", models, terms, replicates, seed, workers, progress)
+
+
+def permutation(models, terms, tested, replicates=1000, seed=0, workers=None, progress=None):
+    """Permutation test of term ``tested`` within the model with ``terms``."""
+    names = [col for term in TERMS if term in terms for col in TERMS[term]]
+    permuted = tuple(1 + names.index(col) for col in TERMS[tested])
+    return _run("permutation", models, terms, replicates, seed, workers, progress, permuted)
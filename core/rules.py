@@ -0,0 +1,109 @@
+"""Rule table for removing unwanted foods from the FNDDS dataset.
+
+A food is dropped if any one rule matches it, so the rules are a plain table
+rather than an if/elif chain. ``compile_rules()`` turns the table into two
+alternation regexes and a set of code prefixes, and ``drop_mask()`` applies
+them to whole columns at once.
+"""
+
+import re
+from dataclasses import dataclass
+
+# 1. First two digits of the Food code
+FOOD_CODE_PREFIXES = (
+    13,  # Milk desserts and sauces
+    28,  # Frozen meals, soups, gravies
+    32,  # Egg mixture
+    33,  # Egg substitutes
+    51,  # Yeast breads, rolls
+    52,  # Quick breads
+    53,  # Cakes, cookies, pies, pastries, bars
+    54,  # Crackers, snack products
+    55,  # Pancakes, waffles, French toast, other grain products
+    58,  # Grain mixtures, frozen meals, soups
+    59,  # Meat substitutes
+    67,  # Fruits and juices baby food
+    77,  # Vegetables with meat, poultry, fish
+    78,  # Mixtures mostly vegetables without meat, poultry, fish
+    83,  # Salad dressings
+    89,  # 'For use' with a sandwich or vegetable
+    95,  # Formulated nutrition beverages, energy drinks, sports drinks
+)
+
+# 2. Case-sensitive substrings of the WWEIA Category description
+CATEGORY_KEYWORDS = (
+    "substitutes", "sauces", "desserts", "Smoothies", "Formula", "Flavored",
+    "shakes", "Pizza", "sandwich", "Baby", "Mix", "mix", "patties", "dinner",
+    "sauce", "Burger", "Soup", "Processed", "Fried", "chip", "condiment",
+    "combination", "juice", "Margarine", "dressing", "topping", "sorbet",
+    "Candy", "soft drink", "diet", "fried", "baked", "Pudding", "Liquor",
+    "Wine", "Beer", "Soft drinks", "Pickle", "pickle", "dish", "Dried fruit",
+    "Pasta", "Cracker", "cured", "Sausages", "Coleslaw", "Fruit drinks",
+    "creamed", "Oatmeal", "cereal", "Frankfurter",
+)
+
+# 3. Case-sensitive substrings of the Main food description
+DESCRIPTION_KEYWORDS = (
+    "reconstituted", "evaporated", "flavor", "parfait", "imitation", "topping",
+    "sugar free", "beverage", "blend", "lowfat", "reduced", "fat free",
+    "low fat", "light", "spread", "dessert", "processed", "with",
+    "pressurized", "Imitation", "pickled", "baked", "nonfat", "NS as to",
+    "roasted", "rotisserie", "stewed", "fried", "grilled", "Spam", "packaged",
+    "cooked", "steamed", "smoked", "mixed", "fat added", "pie", "no meat",
+    "stew", "pasta", "Pasta", "lower", "fortified", "juice", "syrup", "Cereal",
+    "Cream of", "Sauce", "ingredient", "enhanced", "diet", "Wine", "drink",
+    "mix", "instant", "Iced", "Cappuccino", "cafe ", "sauce", "tub",
+    "drippings", "Fritter", "Stuffed ", "creamed", "bottled", "bubble",
+    "substitute", "Latte", "Mocha", "brew", "powder", "macchiato", "Cuban",
+    "Sugar, cinnamon", "confectioner", "Sun-dried", "Mix", "Table fat, NFS",
+    "Honey butter", "chocolate", "bread", "boil", "candied", "Dal", "jelly",
+    "Congee", "cocktail", "Bacon bits", "restaurant", "frank", "Wasabi peas",
+    "Shrimp scampi", "vegetarian", "Baked", "Fried", "nugget",
+    "Duck, pressed, Chinese", "pot roast", "coated", "cracklings", "saute",
+    "other sources", "Soy nut", "NFS", "and", "sandwich", "maraschino",
+    "Tahini", " butter", " salted", "canned", "decaffeinated", "from frozen",
+    "casserole", "Liver, paste or pate", "Pork skin rinds", "patty",
+    "Cream, whipped", "Fish, stick", "white only", "yolk only", "Almond paste",
+    "salad", "Broccoli raab", "lactose free", "Fufu", ", fruit",
+)
+
+
+@dataclass(frozen=True)
+class CompiledRules:
+    code_prefixes: frozenset
+    category_pattern: re.Pattern
+    description_pattern: re.Pattern
+
+
+def _alternation(keywords):
+    # Longest first so overlapping keywords can't shadow each other
+    unique = sorted(set(keywords), key=len, reverse=True)
+    return re.compile("|".join(re.escape(k) for k in unique))
+
+
+def compile_rules(
+    code_prefixes=FOOD_CODE_PREFIXES,
+    category_keywords=CATEGORY_KEYWORDS,
+    description_keywords=DESCRIPTION_KEYWORDS,
+):
+    return CompiledRules(
+        frozenset(f"{p:02d}" for p in code_prefixes),
+        _alternation(category_keywords),
+        _alternation(description_keywords),
+    )
+
+
+DEFAULT_RULES = compile_rules()
+
+
+def drop_mask(nutrients, rules=DEFAULT_RULES):
+    """Boolean Series that is True for every row any rule removes."""
+    code = nutrients["Food code"].astype(str).str[:2].isin(rules.code_prefixes)
+    cat = nutrients["WWEIA Category description"].str.contains(rules.category_pattern, na=False)
+    des = nutrients["Main food description"].str.contains(rules.description_pattern, na=False)
+    return code | cat | des
+
+
+def apply_rules(nutrients, rules=DEFAULT_RULES):
+    """Return ``nutrients`` without the rows matched by ``rules``."""
+    return nutrients[~drop_mask(nutrients, rules)]
@@ -0,0 +1,162 @@
+"""Indexed, typo-tolerant search over FNDDS food descriptions.
+
+A ``str.contains`` scan per keystroke is linear in the table. ``SearchIndex``
+is built once per dataset version. It has an inverted index from tokens to
+row positions, a sorted vocabulary for prefix matches, and a trigram index
+over the vocabulary for typo-tolerant matches. A query touches only the
+postings of the tokens it matches.
+"""
+
+import bisect
+import re
+from functools import lru_cache
+
+import numpy as np
+
+SEARCH_FIELDS = {"Main food description": 1.0, "WWEIA Category description": 0.5}
+
+# Weight of a query token's best match, by kind
+EXACT, PREFIX, FUZZY = 1.0, 0.8, 0.6
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    return _TOKEN.findall(str(text).lower())
+
+
+def _trigrams(token):
+    padded = f"${token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _bitmasks(token):
+    """For each character of ``token``, a bitmask of the positions it occupies."""
+    masks = {}
+    for i, c in enumerate(token):
+        masks[c] = masks.get(c, 0) | 1 << i
+    return masks
+
+
+def _within(token, masks, other, limit):
+    """True if the Levenshtein distance from ``token`` to ``other`` is <= ``limit``.
+
+    ``masks`` is ``_bitmasks(token)``. This is Myers' bit-parallel algorithm:
+    the DP column for ``token`` is held as vertical +1/-1 deltas in two
+    integers, so each character of ``other`` costs a few integer operations.
+    """
+    if abs(len(token) - len(other)) > limit:
+        return False
+    full = (1 << len(token)) - 1
+    last = 1 << (len(token) - 1)
+    pv, mv, score = full, 0, len(token)
+    for c in other:
+        eq = masks.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & full)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = (ph << 1 | 1) & full
+        mh = (mh << 1) & full
+        pv = mh | (~(xv | ph) & full)
+        mv = ph & xv
+    return score <= limit
+
+
+def _typo_limit(token):
+    return 0 if len(token) <= 3 else 1 if len(token) <= 6 else 2
+
+
+class SearchIndex:
+    """Search index over the description columns of ``frame``."""
+
+    def __init__(self, frame, fields=SEARCH_FIELDS, cache_size=1024):
+        self.size = len(frame)
+        postings = {}  # token -> {row position: field weight}
+        lengths = np.zeros(self.size, dtype=np.int32)
+        for field, weight in fields.items():
+            if field not in frame:
+                continue
+            for pos, text in enumerate(frame[field].astype(str)):
+                if weight == max(fields.values()):
+                    lengths[pos] = len(text)
+                for token in tokenize(text):
+                    rows = postings.setdefault(token, {})
+                    rows[pos] = max(rows.get(pos, 0.0), weight)
+
+        self.vocabulary = tuple(sorted(postings))
+        self._rows = []
+        self._weights = []
+        for token in self.vocabulary:
+            rows = postings[token]
+            self._rows.append(np.fromiter(rows.keys(), dtype=np.int32, count=len(rows)))
+            self._weights.append(np.fromiter(rows.values(), dtype=np.float32, count=len(rows)))
+        self._token_id = {token: i for i, token in enumerate(self.vocabulary)}
+
+        self._trigram_tokens = {}
+        for i, token in enumerate(self.vocabulary):
+            for gram in _trigrams(token):
+                self._trigram_tokens.setdefault(gram, []).append(i)
+
+        self._lengths = lengths
+        self.query = lru_cache(maxsize=cache_size)(self._query)
+
+    def _matches(self, token, allow_prefix):
+        """``{token id: match weight}`` for one query token."""
+        matches = {}
+        exact = self._token_id.get(token)
+        if exact is not None:
+            matches[exact] = EXACT
+        if allow_prefix:
+            i = bisect.bisect_left(self.vocabulary, token)
+            while i < len(self.vocabulary) and self.vocabulary[i].startswith(token):
+                matches.setdefault(i, PREFIX)
+                i += 1
+        limit = _typo_limit(token)
+        if limit:
+            grams = _trigrams(token)
+            shared = {}
+            for gram in grams:
+                for i in self._trigram_tokens.get(gram, ()):
+                    shared[i] = shared.get(i, 0) + 1
+            # A token within ``limit`` edits keeps most of its trigrams
+            need = max(1, len(grams) - 3 * limit)
+            masks = _bitmasks(token)
+            for i, n in shared.items():
+                if n >= need and i not in matches and _within(token, masks, self.vocabulary[i], limit):
+                    matches[i] = FUZZY
+        return matches
+
+    def _query(self, text, limit=None):
+        tokens = tokenize(text)
+        if not tokens:
+            return np.arange(0, dtype=np.int32)
+        total = np.zeros(self.size, dtype=np.float32)
+        matched = np.zeros(self.size, dtype=np.int32)
+        for n, token in enumerate(tokens):
+            best = np.zeros(self.size, dtype=np.float32)
+            # Only the token being typed is matched as a prefix
+            matches = self._matches(token, allow_prefix=n == len(tokens) - 1)
+            if matches:
+                # One scatter for every matched token; a short prefix matches hundreds
+                rows = np.concatenate([self._rows[i] for i in matches])
+                np.maximum.at(best, rows, np.concatenate(
+                    [self._weights[i] * weight for i, weight in matches.items()]))
+            total += best
+            matched += best > 0
+        hits = np.flatnonzero(matched == len(tokens))
+        if not len(hits):
+            hits = np.flatnonzero(matched)
+        # Most query tokens matched, then best score, then shortest description
+        order = np.lexsort((self._lengths[hits], -total[hits], -matched[hits]))
+        result = hits[order][:limit].astype(np.int32)
+        result.flags.writeable = False
+        return result
+
+    def search(self, frame, text, limit=None):
+        """Rows of ``frame`` (the frame the index was built on) matching ``text``."""
+        return frame.iloc[self.query(text, limit)]
@@ -0,0 +1,85 @@
+"""Nearest-neighbour search over normalized nutrient profiles.
+
+``SimilarityIndex`` builds one float32 matrix per profile basis (per 100 g
+or per kcal) and scaling (z-scored or %DV) when the dataset is built. A
+"foods similar to X" query is then one matrix-vector product against that
+matrix and an ``argpartition``, with no Python loop over rows.
+"""
+
+import numpy as np
+
+from core.daily_values import DEFAULT_PROFILE, ENABLED, dv_vector
+from core.rankings import ENERGY_COLUMN, ID_COLUMNS
+
+BASES = {"per_100g": "Per 100 g", "per_kcal": "Per kcal"}
+SCALINGS = {"zscore": "z-scored", "pdv": "% Daily Value"}
+
+
+def nutrient_columns(frame):
+    """Numeric nutrient columns of ``frame``, without IDs or %DV columns."""
+    return [
+        col for col in frame.select_dtypes("number").columns
+        if col not in ID_COLUMNS and not col.endswith(" PDV")
+    ]
+
+
+class SimilarityIndex:
+    """Precomputed normalized nutrient matrices for ``frame``'s rows."""
+
+    def __init__(self, frame):
+        self.size = len(frame)
+        columns = nutrient_columns(frame)
+        values = frame[columns].to_numpy(dtype=np.float64)
+        energy = frame[ENERGY_COLUMN].to_numpy(dtype=np.float64)
+        dv_columns = [dv.column for dv in ENABLED if dv.column in columns]
+        dv_index = [columns.index(col) for col in dv_columns]
+
+        self._matrices = {}
+        for basis in BASES:
+            if basis == "per_kcal":
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    base = values / energy[:, None]
+                base[~np.isfinite(base)] = np.nan
+                keep = [i for i, col in enumerate(columns) if col != ENERGY_COLUMN]
+            else:
+                base = values
+                keep = list(range(len(columns)))
+            for scaling in SCALINGS:
+                if scaling == "zscore":
+                    x = base[:, keep]
+                    mean = np.nanmean(x, axis=0)
+                    std = np.nanstd(x, axis=0)
+                    std[~(std > 0)] = 1.0
+                    x = (x - mean) / std
+                else:
+                    x = base[:, dv_index] / dv_vector(DEFAULT_PROFILE) * 100
+                # Missing values sit at the column's centre (z) or at zero (%DV)
+                x = np.nan_to_num(x, nan=0.0, posinf=0.0, neginf=0.0).astype(np.float32)
+                x.flags.writeable = False
+                norms = np.einsum("ij,ij->i", x, x)
+                self._matrices[basis, scaling] = (x, norms)
+
+    def neighbours(self, positions, k=10, basis="per_100g", scaling="zscore"):
+        """``(indices, distances)`` of the ``k`` nearest rows to each of ``positions``.
+
+        Both results have shape ``(len(positions), k)``; a row is never its
+        own neighbour.
+        """
+        x, norms = self._matrices[basis, scaling]
+        positions = np.atleast_1d(np.asarray(positions))
+        k = min(k, self.size - 1)
+        # Squared Euclidean distance for the whole batch in one product
+        d2 = norms[positions, None] + norms[None, :] - 2 * (x[positions] @ x.T)
+        d2[np.arange(len(positions)), positions] = np.inf
+        nearest = np.argpartition(d2, k - 1, axis=1)[:, :k]
+        part = np.take_along_axis(d2, nearest, axis=1)
+        order = np.argsort(part, axis=1, kind="stable")
+        nearest = np.take_along_axis(nearest, order, axis=1)
+        distances = np.sqrt(np.maximum(np.take_along_axis(part, order, axis=1), 0))
+        return nearest, distances
+
+    def similar(self, frame, position, k=10, basis="per_100g", scaling="zscore"):
+        """Rows of ``frame`` nearest to row ``position``, with a ``Distance`` column."""
+        nearest, distances = self.neighbours([position], k, basis, scaling)
+        rows = frame.iloc[nearest[0]]
+        return rows.assign(Distance=distances[0])
@@ -0,0 +1,127 @@
+"""Columnar snapshot of the FNDDS dataset for fast cold starts.
+
+Parsing the USDA CSV (banner row, newline-split headers, 70 columns) is the
+slowest part of a cold start. ``python -m core.snapshot`` writes the raw and
+the cleaned, %DV-augmented tables to uncompressed Arrow IPC (Feather) files
+with tight dtypes, which ``read_snapshot()`` memory-maps back. Numeric
+columns reach pandas as read-only views onto the mapping, one block per
+column, so only the categorical text and the index are copied. A snapshot
+records the source file's mtime and SHA-256 plus a fingerprint of the
+cleaning rules; if any of them no longer match, it is stale and the loader
+falls back to the CSV.
+
+Nutrients are stored as float32. The USDA amounts have at most seven
+significant digits and round-trip exactly, but the derived %DV columns keep
+only float32 precision (about 1e-7 relative), so a snapshot build serves
+4.6666665 where a CSV build computes 4.666666666666667.
+"""
+
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from core import daily_values, rules
+
+# Bump when the cleaning or %DV derivation changes in a way the rule tables
+# don't capture.
+DERIVATION_VERSION = 1
+
+INT_COLUMNS = ("Food code", "WWEIA Category number")
+METADATA_KEY = b"fndds_snapshot"
+
+
+def snapshot_paths(source):
+    source = Path(source)
+    return (
+        source.with_name(source.stem + ".raw.arrow"),
+        source.with_name(source.stem + ".cleaned.arrow"),
+    )
+
+
+def derivation_fingerprint():
+    parts = (
+        DERIVATION_VERSION,
+        rules.FOOD_CODE_PREFIXES,
+        rules.CATEGORY_KEYWORDS,
+        rules.DESCRIPTION_KEYWORDS,
+        daily_values.VERSION,
+        daily_values.DAILY_VALUES,
+    )
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+def compact(frame):
+    """Return ``frame`` with int32 codes, float32 nutrients and categorical text."""
+    columns = {}
+    for col in frame.columns:
+        values = frame[col]
+        if col in INT_COLUMNS:
+            columns[col] = values.astype("int32")
+        elif pd.api.types.is_numeric_dtype(values):
+            columns[col] = values.astype("float32")
+        else:
+            columns[col] = values.astype("category")
+    return pd.DataFrame(columns, index=frame.index)
+
+
+def write_snapshot(dataset):
+    """Write compact copies of ``dataset.raw`` and ``dataset.cleaned``."""
+    meta = json.dumps({
+        "mtime_ns": dataset.mtime_ns,
+        "sha256": dataset.sha256,
+        "fingerprint": derivation_fingerprint(),
+    }).encode()
+    written = []
+    for frame, path in zip((dataset.raw, dataset.cleaned), snapshot_paths(dataset.source)):
+        table = pa.Table.from_pandas(compact(frame), preserve_index=True)
+        table = table.replace_schema_metadata({**table.schema.metadata, METADATA_KEY: meta})
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        feather.write_feather(table, tmp, compression="uncompressed")
+        tmp.replace(path)
+        written.append(path)
+    return written
+
+
+def _read(path):
+    table = feather.read_table(path, memory_map=True)
+    meta = json.loads(table.schema.metadata[METADATA_KEY])
+    return table, meta
+
+
+def read_snapshot(source, mtime_ns, file_hash):
+    """Return ``(raw, cleaned, sha256)`` from a fresh snapshot, else ``None``.
+
+    ``file_hash`` is only called when the source mtime differs from the one
+    recorded in the snapshot, so an unchanged deployment never re-reads the CSV.
+    """
+    raw_path, cleaned_path = snapshot_paths(source)
+    try:
+        raw, raw_meta = _read(raw_path)
+        cleaned, meta = _read(cleaned_path)
+    except (OSError, KeyError, ValueError, pa.ArrowInvalid):
+        return None
+    if raw_meta != meta or meta["fingerprint"] != derivation_fingerprint():
+        return None
+    if meta["mtime_ns"] != mtime_ns and file_hash(source) != meta["sha256"]:
+        return None
+    # The default conversion consolidates columns into 2-D blocks, copying
+    # everything out of the mapping
+    return raw.to_pandas(split_blocks=True), cleaned.to_pandas(split_blocks=True), meta["sha256"]
+
+
+def main(argv=None):
+    from core.dataset import FNDDS_CSV, build_dataset
+
+    args = sys.argv[1:] if argv is None else argv
+    source = Path(args[0]) if args else FNDDS_CSV
+    for path in write_snapshot(build_dataset(source, use_snapshot=False)):
+        print(f"wrote {path} ({path.stat().st_size / 1e6:.2f} MB)")
+
+
+if __name__ == "__main__":
+    main()
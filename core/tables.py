@@ -0,0 +1,141 @@
+"""Windowed, server-side table rendering.
+
+``st.dataframe(frame)`` serializes the whole frame to the browser on every
+rerun. ``paged_table()`` keeps the frame on the server, does search, filter
+and sort there, and sends only the visible page of the chosen columns, so the
+payload per rerun stays bounded however large the FNDDS release is.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+PAGE_SIZES = (10, 25, 50, 100)
+MAX_COLUMNS = 30
+SEARCH_COLUMNS = ("Main food description", "WWEIA Category description")
+FILTER_COLUMN = "WWEIA Category description"
+
+
+def _find(frame, name):
+    # Raw FNDDS headers may still contain the newline split
+    for col in frame.columns:
+        if " ".join(str(col).split("\n")) == name:
+            return col
+    return None
+
+
+def for_display(rows):
+    """``rows`` with categorical columns turned back into plain strings.
+
+    Arrow serializes a categorical's full dictionary, so a page of the
+    snapshot's categorical descriptions would otherwise carry every
+    description in the release.
+    """
+    categorical = [col for col, dtype in rows.dtypes.items() if isinstance(dtype, pd.CategoricalDtype)]
+    if not categorical:
+        return rows
+    # assign() converts only these columns; astype() with a dict walks every one
+    return rows.assign(**{col: rows[col].astype(str) for col in categorical})
+
+
+def matching_positions(frame, search="", categories=(), search_index=None):
+    """Row positions of ``frame`` matching a text search and category filter.
+
+    With a ``search_index`` (a ``core.search.SearchIndex`` built on
+    ``frame``) the search is indexed and typo-tolerant, and matches come
+    back in relevance order; otherwise it is a substring scan.
+    """
+    if search and search_index is not None:
+        positions = search_index.query(search)
+    elif search:
+        hits = np.zeros(len(frame), dtype=bool)
+        for name in SEARCH_COLUMNS:
+            col = _find(frame, name)
+            if col is not None:
+                hits |= frame[col].astype(str).str.contains(search, case=False, regex=False).to_numpy()
+        positions = np.flatnonzero(hits)
+    else:
+        positions = np.arange(len(frame))
+    filter_col = _find(frame, FILTER_COLUMN)
+    if categories and filter_col is not None:
+        keep = frame[filter_col].isin(categories).to_numpy()
+        positions = positions[keep[positions]]
+    return positions
+
+
+def sort_positions(frame, positions, sort_by=None, ascending=True):
+    """``positions`` reordered by ``frame[sort_by]``, without copying rows."""
+    if sort_by is None:
+        return positions
+    keys = frame[sort_by].to_numpy()[positions]
+    if np.issubdtype(keys.dtype, np.number):
+        order = np.argsort(keys if ascending else -keys, kind="stable")
+    else:
+        order = np.argsort(keys.astype(str), kind="stable")
+        if not ascending:
+            order = order[::-1]
+    return positions[order]
+
+
+def window(frame, positions, columns=None, sort_by=None, ascending=True, page=1,
+           page_size=PAGE_SIZES[1]):
+    """One page of ``frame.iloc[positions]``, sorted by ``sort_by``.
+
+    Sorting works on row positions only; the returned page is the only data
+    copied out of ``frame``.
+    """
+    positions = sort_positions(frame, positions, sort_by, ascending)
+    start = (page - 1) * page_size
+    rows = frame.iloc[positions[start:start + page_size]]
+    return for_display(rows[list(columns)] if columns else rows)
+
+
+def paged_table(frame, key, default_columns=None, page_size=PAGE_SIZES[1], search_index=None,
+                export_name=None, export_version=None):
+    """Render ``frame`` as a searchable, sortable, paged table.
+
+    With an ``export_name``, the matching rows (all pages, in the chosen
+    order and columns) can be downloaded as CSV or Parquet.
+    ``export_version`` must change whenever ``frame``'s contents do.
+    """
+    all_columns = list(frame.columns)
+    default_columns = list(default_columns or all_columns[:8])
+
+    c1, c2 = st.columns([2, 1])
+    search = c1.text_input("Search foods:", key=f"{key}_search")
+    filter_col = _find(frame, FILTER_COLUMN)
+    categories = ()
+    if filter_col is not None:
+        categories = c2.multiselect(
+            "Category:", sorted(frame[filter_col].astype(str).unique()), key=f"{key}_categories"
+        )
+    columns = st.multiselect(
+        "Columns:", all_columns, default=default_columns,
+        max_selections=MAX_COLUMNS, key=f"{key}_columns",
+    )
+
+    c1, c2, c3 = st.columns([2, 1, 1])
+    sort_by = c1.selectbox("Sort by:", [None] + all_columns, key=f"{key}_sort",
+                           format_func=lambda col: "(table order)" if col is None else col)
+    ascending = c2.radio("Order:", ["Ascending", "Descending"], key=f"{key}_order",
+                         horizontal=True) == "Ascending"
+    size = c3.selectbox("Rows per page:", PAGE_SIZES, index=PAGE_SIZES.index(page_size),
+                        key=f"{key}_size")
+
+    positions = matching_positions(frame, search, categories, search_index)
+    pages = max(1, math.ceil(len(positions) / size))
+    page = st.number_input("Page:", min_value=1, max_value=pages, value=1, step=1,
+                           key=f"{key}_page")
+
+    rows = window(frame, positions, columns or default_columns, sort_by, ascending,
+                  min(page, pages), size)
+    st.dataframe(rows)
+    st.caption(f"Page {min(page, pages)} of {pages} · {len(positions)} of {len(frame)} rows match")
+    if export_name is not None:
+        from core.export import download_buttons
+
+        download_buttons(frame, sort_positions(frame, positions, sort_by, ascending),
+                         columns or default_columns, export_name, export_version, key)
+    return rows
@@ -0,0 +1,92 @@
+"""Background warm-up of the shared caches at server start.
+
+Pages are registered as script paths, so without this the first visitor to
+the Nutrition Tool after a deploy pays for importing pandas, loading the
+dataset and building its rankings. ``start()`` does that work on a daemon
+thread; the metrics server reports when it is done as ``/ready`` and the
+``warmup_ready`` gauge. Run the app with
+
+    python -m core.warmup [streamlit run options]
+
+to start warming before the server accepts its first session; with a plain
+``streamlit run``, ``streamlit_app.py`` starts it on the first script run.
+
+This module must stay cheap to import: heavy modules are only imported on
+the warm-up thread, so lightweight pages never pay for them.
+"""
+
+import logging
+import os
+import sys
+import threading
+from pathlib import Path
+
+from core.instrument import add_route, register_gauge, stage, start_metrics_server
+
+logger = logging.getLogger(__name__)
+
+APP = Path(__file__).resolve().parent.parent / "streamlit_app.py"
+
+_lock = threading.Lock()
+_ready = threading.Event()
+_thread = None
+_error = None
+
+
+def _warm():
+    global _error
+    try:
+        with stage("warmup"):
+            from core import images, prerender
+            from core.dataset import load_nutrients
+
+            images.warm_cache()
+            prerender.warm()
+            load_nutrients()
+    except Exception as exc:  # the pages will load lazily instead
+        _error = exc
+        logger.exception("cache warm-up failed")
+    finally:
+        _ready.set()
+
+
+def start():
+    """Start warming the caches in the background; later calls are no-ops."""
+    global _thread
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_warm, name="warmup", daemon=True)
+            _thread.start()
+    return _thread
+
+
+def _ready_route():
+    ok = _ready.is_set() and _error is None
+    return (200 if ok else 503), "text/plain", "ready\n" if ok else "warming\n"
+
+
+register_gauge("warmup_ready", lambda: int(_ready.is_set() and _error is None))
+add_route("/ready", _ready_route)
+
+
+def main(argv=None):
+    from streamlit.web import cli
+
+    # Under ``python -m`` this module is __main__; start the copy that
+    # streamlit_app.py will import so the warm-up only runs once
+    from core import warmup
+
+    warmup.start()
+    if os.environ.get("APP_METRICS_PORT"):
+        start_metrics_server(int(os.environ["APP_METRICS_PORT"]))
+    if os.environ.get("APP_API_PORT"):
+        from core.api import start_api_server
+
+        start_api_server(int(os.environ["APP_API_PORT"]))
+    args = sys.argv[1:] if argv is None else argv
+    sys.argv = ["streamlit", "run", str(APP), *args]
+    sys.exit(cli.main())
+
+
+if __name__ == "__main__":
+    main()
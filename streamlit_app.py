@@ -1,5 +1,23 @@
+import os
+
 import streamlit as st
 
+from core import warmup
+from core.instrument import start_metrics_server
+
+# Fill the shared caches in the background (no-op after the first run)
+warmup.start()
+
+# Prometheus-style /metrics and /ready, when asked for
+if os.environ.get("APP_METRICS_PORT"):
+    start_metrics_server(int(os.environ["APP_METRICS_PORT"]))
+
+# Headless JSON API over the same cached dataset, when asked for
+if os.environ.get("APP_API_PORT"):
+    from core.api import start_api_server
+
+    start_api_server(int(os.environ["APP_API_PORT"]))
+
 # Page setup
 about_page = st.Page(
     page = "views/about_me.py",
@@ -0,0 +1,99 @@
+"""JSON and export endpoints over HTTP: ETags, 304s and streamed exports."""
+
+import gzip
+import http.client
+import io
+import json
+import threading
+from http.server import ThreadingHTTPServer
+from urllib.parse import urlencode
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from core import api
+from core.dataset import FNDDS_CSV
+
+pytestmark = pytest.mark.skipif(not FNDDS_CSV.exists(), reason="FNDDS CSV not available")
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), api._APIHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _get(server, target, **headers):
+    connection = http.client.HTTPConnection(*server.server_address, timeout=30)
+    try:
+        connection.request("GET", target, headers=headers)
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+
+def test_json_etag_and_304(server):
+    target = "/api/top?" + urlencode({"nutrient": "Selenium PDV", "n": 50})
+    status, headers, full = _get(server, target)
+    assert status == 200
+    assert len(json.loads(full)["foods"]) == 50
+    etag = headers["ETag"]
+
+    status, headers, body = _get(server, target, **{"If-None-Match": etag})
+    assert (status, body) == (304, b"")
+    assert headers["ETag"] == etag
+    # Any one of a list of tags matches
+    assert _get(server, target, **{"If-None-Match": f'"stale", {etag}'})[0] == 304
+    assert _get(server, target, **{"If-None-Match": '"stale"'})[0] == 200
+
+    status, headers, zipped = _get(server, target, **{"Accept-Encoding": "gzip"})
+    assert headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(zipped) == full
+    assert headers["ETag"] == etag
+
+
+def test_errors_are_not_answered_with_304(server):
+    status, headers, body = _get(server, "/api/top?nutrient=nope")
+    assert status == 400
+    assert _get(server, "/api/top?nutrient=nope", **{"If-None-Match": headers["ETag"]})[0] == 400
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet"])
+def test_export_streams_then_serves_from_cache(server, fmt):
+    target = "/api/export?" + urlencode([
+        ("format", fmt), ("ge", "Magnesium PDV:20"),
+        ("column", "Food code"), ("column", "Magnesium PDV"), ("sort", "Magnesium PDV"),
+    ])
+    status, headers, streamed = _get(server, target)
+    assert status == 200
+    etag = headers["ETag"]
+    # The first request is built while it is sent; the repeat is one cached body
+    assert headers["Transfer-Encoding"] == "chunked"
+    status, headers, repeat = _get(server, target)
+    assert status == 200
+    assert headers["Content-Length"] == str(len(repeat))
+    assert repeat == streamed and headers["ETag"] == etag
+
+    if fmt == "csv":
+        frame = pd.read_csv(io.BytesIO(streamed))
+    else:
+        frame = pq.read_table(io.BytesIO(streamed)).to_pandas()
+    assert list(frame.columns) == ["Food code", "Magnesium PDV"]
+    assert len(frame) and (frame["Magnesium PDV"] >= 20).all()
+    assert frame["Magnesium PDV"].is_monotonic_increasing
+
+    status, _, body = _get(server, target, **{"If-None-Match": etag})
+    assert (status, body) == (304, b"")
+
+
+def test_export_rejects_unknown_format(server):
+    status, headers, body = _get(server, "/api/export?format=xlsx")
+    assert status == 400
+    assert "unknown format" in json.loads(body)["error"]
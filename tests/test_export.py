@@ -0,0 +1,67 @@
+"""CSV and Parquet exports read back as the rows and columns they were built from."""
+
+import io
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from core import export
+from core.dataset import FNDDS_CSV, build_dataset
+from core.tables import for_display
+
+pytestmark = pytest.mark.skipif(not FNDDS_CSV.exists(), reason="FNDDS CSV not available")
+
+
+@pytest.fixture(scope="module")
+def cleaned():
+    return build_dataset(FNDDS_CSV).cleaned
+
+
+@pytest.fixture(scope="module")
+def view(cleaned):
+    positions = np.random.default_rng(0).permutation(len(cleaned))
+    columns = ["Food code", "Main food description", "WWEIA Category description",
+               *[col for col in cleaned.columns if col.endswith("PDV")][:5]]
+    return positions, columns
+
+
+def _expected(frame, positions, columns):
+    return for_display(frame.iloc[positions][columns]).reset_index(drop=True)
+
+
+def test_csv_round_trip(cleaned, view):
+    positions, columns = view
+    # Chunks smaller than the view, so rows from several chunks are joined
+    data = b"".join(export.iter_csv(cleaned, positions, columns, chunk_rows=100))
+    expected = _expected(cleaned, positions, columns)
+    pd.testing.assert_frame_equal(pd.read_csv(io.BytesIO(data)), expected,
+                                  check_dtype=False, check_exact=False, rtol=1e-6)
+
+
+def test_parquet_round_trip(cleaned, view):
+    positions, columns = view
+    data = b"".join(export.iter_parquet(cleaned, positions, columns, chunk_rows=100))
+    parquet = pq.ParquetFile(io.BytesIO(data))
+    assert parquet.metadata.num_row_groups == 3
+    pd.testing.assert_frame_equal(parquet.read().to_pandas(), _expected(cleaned, positions, columns))
+
+
+@pytest.mark.parametrize("fmt", list(export.FORMATS))
+def test_empty_export_keeps_the_columns(cleaned, view, fmt):
+    _, columns = view
+    data = b"".join(export.ITERATORS[fmt](cleaned, np.array([], dtype=np.int64), columns))
+    frame = pd.read_csv(io.BytesIO(data)) if fmt == "csv" else pq.read_table(io.BytesIO(data)).to_pandas()
+    assert frame.empty
+    assert list(frame.columns) == columns
+
+
+def test_export_bytes_is_cached_per_view(cleaned, view):
+    positions, columns = view
+    first = export.export_bytes(cleaned, positions, columns, "csv", "test")
+    assert export.export_bytes(cleaned, positions.copy(), list(columns), "csv", "test") is first
+    assert export.export_key("test", positions, columns, "csv") != export.export_key(
+        "test", positions[::-1], columns, "csv")
+    assert export.export_key("test", positions, columns, "csv") != export.export_key(
+        "other", positions, columns, "csv")
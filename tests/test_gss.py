@@ -0,0 +1,91 @@
+"""Weighted logistic fits on a synthetic GSS extract with known coefficients."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.gss import MODELS, load_models
+
+# Model 1's design columns, in order, and the coefficients the outcome is drawn from
+TRUE_COEF = {
+    "(Intercept)": -1.2,
+    "Independent": 0.2,
+    "Republican": 0.45,
+    "Age": 0.01,
+    "Black": -0.35,
+    "Other race": 0.3,
+    "Female": 0.1,
+}
+
+
+def _extract(n=12000, seed=0, **fixed):
+    """A GSS-coded extract whose "very happy" answers follow ``TRUE_COEF``."""
+    rng = np.random.default_rng(seed)
+    gss = pd.DataFrame({
+        "year": rng.choice([2016, 2018, 2021, 2022], n),
+        "partyid": rng.integers(0, 7, n),
+        "age": rng.integers(18, 90, n),
+        "race": rng.integers(1, 4, n),
+        "sex": rng.integers(1, 3, n),
+        "marital": rng.integers(1, 6, n),
+        "hapmar": rng.integers(1, 4, n),
+        "wtssnrps": rng.uniform(0.3, 3.0, n),
+    })
+    for column, value in fixed.items():
+        gss[column] = value
+    eta = (TRUE_COEF["(Intercept)"]
+           + TRUE_COEF["Independent"] * gss["partyid"].between(2, 4)
+           + TRUE_COEF["Republican"] * gss["partyid"].between(5, 6)
+           + TRUE_COEF["Age"] * gss["age"]
+           + TRUE_COEF["Black"] * (gss["race"] == 2)
+           + TRUE_COEF["Other race"] * (gss["race"] == 3)
+           + TRUE_COEF["Female"] * (gss["sex"] == 2))
+    gss["happy"] = np.where(rng.random(n) < 1 / (1 + np.exp(-eta)), 1, 2)
+    return gss
+
+
+@pytest.fixture
+def write_extract(tmp_path):
+    def write(gss, name="gss.csv"):
+        path = tmp_path / name
+        gss.to_csv(path, index=False)
+        return path
+    return write
+
+
+def test_fit_recovers_known_coefficients(write_extract):
+    models = load_models(write_extract(_extract()))
+    fit = models.fit_terms(MODELS["Model 1"])
+    assert fit.converged
+    assert fit.names == tuple(TRUE_COEF)
+    assert fit.n == 12000
+    # Every estimate within 4 standard errors of the coefficient it was drawn from
+    assert np.all(np.abs(fit.coef - np.array(list(TRUE_COEF.values()))) < 4 * fit.se)
+
+    # The weighted score vanishes at the solution
+    X, y, w, _ = models.design(fit.terms)
+    mu = 1 / (1 + np.exp(-(X @ fit.coef)))
+    assert np.max(np.abs(X.T @ (w * (y - mu)))) < 1e-6
+
+
+def test_cached_fits_are_read_only(write_extract):
+    models = load_models(write_extract(_extract(n=2000)))
+    fit = models.fit_terms(MODELS["Model 1"])
+    assert models.fit_terms(MODELS["Model 1"][::-1]) is fit
+    for values in (fit.coef, fit.se):
+        with pytest.raises(ValueError):
+            values[0] = 0.0
+
+
+def test_constant_predictor_is_reported(write_extract):
+    # Every respondent male: Female is a column of zeros
+    models = load_models(write_extract(_extract(n=2000, sex=1)))
+    with pytest.raises(ValueError, match="constant or collinear"):
+        models.fit_terms(("Sex",))
+
+
+def test_no_complete_cases_is_reported(write_extract):
+    # Age 99 is "no answer", so no respondent has every Model 1 predictor
+    models = load_models(write_extract(_extract(n=2000, age=99)))
+    with pytest.raises(ValueError, match="too few complete responses"):
+        models.fit_terms(MODELS["Model 1"])
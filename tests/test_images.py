@@ -0,0 +1,59 @@
+"""The in-memory image cache follows changes to the sources and the build."""
+
+import io
+import os
+
+import pytest
+from PIL import Image
+
+from core import images
+
+
+@pytest.fixture
+def assets(tmp_path, monkeypatch):
+    monkeypatch.setattr(images, "ASSETS_DIR", tmp_path)
+    monkeypatch.setattr(images, "BUILD_DIR", tmp_path / "build")
+    monkeypatch.setattr(images, "MANIFEST", tmp_path / "build" / "manifest.json")
+    monkeypatch.setattr(images, "VARIANTS", (("chart.png", 100),))
+    monkeypatch.setattr(images, "_bytes", {})
+    monkeypatch.setattr(images, "_manifest", (None, {}))
+    return tmp_path
+
+
+def _write_png(path, colour, size=(400, 200), mtime_ns=None):
+    out = io.BytesIO()
+    Image.new("RGB", size, colour).save(out, format="PNG")
+    path.write_bytes(out.getvalue())
+    if mtime_ns is not None:
+        # Coarse filesystem clocks could otherwise leave the mtime unchanged
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return out.getvalue()
+
+
+def _width(data):
+    with Image.open(io.BytesIO(data)) as img:
+        return img.width
+
+
+def test_cache_follows_source_and_rebuilds(assets):
+    source = _write_png(assets / "chart.png", "red", mtime_ns=1_000_000_000)
+    assert images.image_bytes("chart.png", 100) == source
+
+    images.build_all()
+    variant = images.image_bytes("chart.png", 100)
+    assert _width(variant) == 100
+    assert images.image_bytes("chart.png", 100) is variant
+
+    # A replaced source is served as is until the variant is rebuilt from it
+    replaced = _write_png(assets / "chart.png", "blue", mtime_ns=2_000_000_000)
+    assert images.image_bytes("chart.png", 100) == replaced
+    images.build_all()
+    rebuilt = images.image_bytes("chart.png", 100)
+    assert _width(rebuilt) == 100 and rebuilt != variant
+
+
+def test_missing_source_is_a_remote_url(assets):
+    assert images.image_bytes("chart.png", 100) == images.REMOTE_BASE + "chart.png"
+    source = _write_png(assets / "chart.png", "red")
+    assert images.image_bytes("chart.png", 100) == source
+    assert images.cache_info() == {"entries": 1, "bytes": len(source)}
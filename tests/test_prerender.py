@@ -0,0 +1,46 @@
+"""Source hashes of ``static_section`` blocks, however the section is named."""
+
+import os
+import textwrap
+
+from core import prerender
+
+SCRIPT = textwrap.dedent('''
+    import streamlit as st
+    from core import prerender
+    from core.prerender import static_section
+
+    with static_section(__file__, "positional") as cached:
+        st.write("a")
+
+    with static_section(__file__, name="keyword") as cached:
+        st.write("b")
+
+    with prerender.static_section(script=__file__, name="attribute") as cached:
+        st.write("c")
+
+    with static_section(__file__, NAME) as cached:
+        st.write("not a literal")
+''')
+
+
+def test_blocks_are_found_by_positional_and_keyword_names(tmp_path):
+    script = tmp_path / "page.py"
+    script.write_text(SCRIPT)
+    hashes = {name: prerender._block_sha256(script, name)
+              for name in ("positional", "keyword", "attribute")}
+    assert None not in hashes.values()
+    assert len(set(hashes.values())) == 3
+    assert prerender._block_sha256(script, "NAME") is None
+
+
+def test_hash_changes_only_with_its_block(tmp_path):
+    script = tmp_path / "page.py"
+    script.write_text(SCRIPT)
+    before = {name: prerender._block_sha256(script, name) for name in ("positional", "keyword")}
+    script.write_text(SCRIPT.replace('st.write("b")', 'st.write("B")'))
+    # Hashes are cached per mtime; coarse filesystem clocks may not move it
+    os.utime(script, ns=(1_000_000_000, 1_000_000_000))
+    after = {name: prerender._block_sha256(script, name) for name in ("positional", "keyword")}
+    assert after["positional"] == before["positional"]
+    assert after["keyword"] != before["keyword"]
@@ -0,0 +1,61 @@
+"""Parity of the bitmap query engine with the equivalent pandas masks."""
+
+import numpy as np
+import pytest
+
+from core.dataset import FNDDS_CSV, build_dataset
+from core.query import CODE_COLUMN, Predicate, QueryEngine
+
+pytestmark = pytest.mark.skipif(not FNDDS_CSV.exists(), reason="FNDDS CSV not available")
+
+
+@pytest.fixture(scope="module")
+def cleaned():
+    return build_dataset(FNDDS_CSV).cleaned
+
+
+def _mask(frame, predicates, exclude):
+    mask = np.ones(len(frame), dtype=bool)
+    for pred in predicates:
+        values = frame[pred.column].to_numpy(dtype=np.float64)
+        if pred.op == ">=":
+            mask &= values >= pred.value
+        elif pred.op == "<=":
+            mask &= values <= pred.value
+        else:
+            low, high = pred.value
+            mask &= (values >= low) & (values <= high)
+    prefixes = frame[CODE_COLUMN].astype(str).str[:2].to_numpy()
+    return mask & ~np.isin(prefixes, list(exclude))
+
+
+def _threshold(rng, values):
+    # Half the thresholds are values in the column, so ties are exercised
+    values = values[np.isfinite(values)]
+    if rng.random() < 0.5:
+        return float(rng.choice(values))
+    return float(rng.uniform(values.min(), values.max()))
+
+
+def test_random_queries_match_pandas_masks(cleaned):
+    engine = QueryEngine(cleaned)
+    rng = np.random.default_rng(0)
+    prefixes = sorted(engine.prefix_labels)
+    for _ in range(300):
+        predicates = []
+        for column in rng.choice(engine.columns, 3, replace=False):
+            values = cleaned[column].to_numpy(dtype=np.float64)
+            op = rng.choice([">=", "<=", "between"])
+            if op == "between":
+                value = tuple(sorted((_threshold(rng, values), _threshold(rng, values))))
+            else:
+                value = _threshold(rng, values)
+            predicates.append(Predicate(str(column), str(op), value))
+        exclude = tuple(rng.choice(prefixes, rng.integers(0, 3), replace=False).tolist())
+        expected = np.flatnonzero(_mask(cleaned, predicates, exclude))
+        np.testing.assert_array_equal(engine.evaluate(tuple(predicates), exclude), expected)
+
+
+def test_no_predicates_match_every_row(cleaned):
+    engine = QueryEngine(cleaned)
+    np.testing.assert_array_equal(engine.evaluate(), np.arange(len(cleaned)))
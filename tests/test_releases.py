@@ -0,0 +1,40 @@
+"""Joining cleaned releases on food code, including a release cleaning empties."""
+
+import numpy as np
+import pandas as pd
+
+from core.releases import KEY, ReleaseSet
+
+
+def _table(codes, protein):
+    return pd.DataFrame({
+        KEY: np.array(codes, dtype=np.int32),
+        "Main food description": pd.Series([f"Food {code}" for code in codes], dtype="str"),
+        "Protein (g)": np.array(protein, dtype=np.float32),
+    })
+
+
+def _releases(**tables):
+    foods = {label: table[[KEY, "Main food description"]] for label, table in tables.items()}
+    return ReleaseSet(tables, foods)
+
+
+def test_diff_joins_on_food_code():
+    releases = _releases(old=_table([30, 10, 20], [3.0, 1.0, 2.0]),
+                         new=_table([20, 40, 10], [2.5, 4.0, 1.0]))
+    np.testing.assert_array_equal(releases.codes, [10, 20, 30, 40])
+    added, removed, deltas = releases.diff("old", "new")
+    assert added[KEY].tolist() == [40]
+    assert removed[KEY].tolist() == [30]
+    assert deltas.index.tolist() == [10, 20]
+    np.testing.assert_allclose(deltas["Protein (g)"], [0.0, 0.5])
+    assert releases.changed("old", "new").index.tolist() == [20]
+
+
+def test_release_with_no_cleaned_rows():
+    releases = _releases(old=_table([10, 20], [1.0, 2.0]), new=_table([], []))
+    np.testing.assert_array_equal(releases._positions["new"], [-1, -1])
+    added, removed, deltas = releases.diff("old", "new")
+    assert added.empty and deltas.empty
+    assert removed[KEY].tolist() == [10, 20]
+    assert releases.changed("new", "old").empty
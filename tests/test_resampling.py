@@ -0,0 +1,45 @@
+"""Bootstrap and permutation replicates, inline and on the process pool."""
+
+import numpy as np
+import pytest
+
+from core import resampling
+from core.gss import MODELS, load_models
+from tests.test_gss import _extract
+
+
+@pytest.fixture(scope="module")
+def models(tmp_path_factory):
+    path = tmp_path_factory.mktemp("gss") / "gss.csv"
+    _extract(n=3000).to_csv(path, index=False)
+    return load_models(path)
+
+
+@pytest.mark.parametrize("kind", ["bootstrap", "permutation"])
+def test_pooled_blocks_match_inline(models, kind, tmp_path, monkeypatch):
+    def run(workers):
+        # A fresh cache directory per run, so neither reads the other's replicates
+        monkeypatch.setattr(resampling, "CACHE_DIR", tmp_path / str(workers))
+        if kind == "bootstrap":
+            return resampling.bootstrap(models, MODELS["Model 1"], replicates=600,
+                                        seed=7, workers=workers)
+        return resampling.permutation(models, MODELS["Model 1"], "Race", replicates=600,
+                                      seed=7, workers=workers)
+
+    inline, pooled = run(1), run(2)
+    assert inline.coef.shape == (600, 7)
+    assert inline.converged.all()
+    np.testing.assert_array_equal(pooled.coef, inline.coef)
+    np.testing.assert_array_equal(pooled.converged, inline.converged)
+    assert resampling._executors[2]._max_workers == 2
+
+
+def test_identical_run_is_read_back(models, tmp_path, monkeypatch):
+    monkeypatch.setattr(resampling, "CACHE_DIR", tmp_path)
+    first = resampling.bootstrap(models, MODELS["Model 1"], replicates=300, seed=1, workers=1)
+    assert len(list(tmp_path.glob("bootstrap-*.npz"))) == 1
+    seen = []
+    again = resampling.bootstrap(models, MODELS["Model 1"], replicates=300, seed=1, workers=1,
+                                 progress=lambda done, total: seen.append((done, total)))
+    assert seen == [(300, 300)]
+    np.testing.assert_array_equal(again.coef, first.coef)
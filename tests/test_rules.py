@@ -0,0 +1,141 @@
+"""Parity of the vectorized cleaning rules with the original per-row loop."""
+
+import pandas as pd
+import pytest
+
+from core.dataset import FNDDS_CSV, _fix_columns, _read_raw
+from core.rules import apply_rules
+
+pytestmark = pytest.mark.skipif(not FNDDS_CSV.exists(), reason="FNDDS CSV not available")
+
+
+def legacy_drop_indices(nutrients):
+    """Row indices the original ``views/project1.py`` loop dropped, kept verbatim."""
+    drop_indices = []
+    for i in range(nutrients.shape[0]): #row indices
+
+        code = nutrients["Food code"][i] #Food code
+        cat = nutrients["WWEIA Category description"][i] #Food category
+        des = nutrients["Main food description"][i]
+
+        #Remove items based on food code
+        if int(str(code)[:2]) in [13,28,32,33,51,52,53,54,55,58,59,67,77,78,83,89,95]:
+            drop_indices.append(i)
+
+        #Remove items based on Food category
+        elif "substitutes" in cat or "sauces" in cat or "desserts" in cat:
+            drop_indices.append(i)
+        elif "Smoothies" in cat or "Formula" in cat or "Flavored" in cat:
+            drop_indices.append(i)
+        elif "shakes" in cat or "Pizza" in cat or "sandwich" in cat:
+            drop_indices.append(i)
+        elif "Baby" in cat or "Mix" in cat or "mix" in cat:
+            drop_indices.append(i)
+        elif "patties" in cat or "dinner" in cat or "sauce" in cat:
+            drop_indices.append(i)
+        elif "Burger" in cat or "Soup" in cat or "Processed" in cat:
+            drop_indices.append(i)
+        elif "Fried" in cat or "chip" in cat or "condiment" in cat:
+            drop_indices.append(i)
+        elif "combination" in cat or "juice" in cat or "Margarine" in cat:
+            drop_indices.append(i)
+        elif "dressing" in cat or "topping" in cat or "sorbet" in cat:
+            drop_indices.append(i)
+        elif "Candy" in cat or "soft drink" in cat or "diet" in cat:
+            drop_indices.append(i)
+        elif "fried" in cat or "baked" in cat or "Pudding" in cat:
+            drop_indices.append(i)
+        elif "Liquor" in cat or "Wine" in cat or "Beer" in cat:
+            drop_indices.append(i)
+        elif "Soft drinks" in cat or "Pickle" in cat or "pickle" in cat:
+            drop_indices.append(i)
+        elif "dish" in cat or "Dried fruit" in cat or "Pasta" in cat:
+            drop_indices.append(i)
+        elif "Cracker" in cat or "cured" in cat or "Sausages" in cat:
+            drop_indices.append(i)
+        elif "Coleslaw" in cat or "Fruit drinks" in cat or "creamed" in cat:
+            drop_indices.append(i)
+        elif "Oatmeal" in cat or "cereal" in cat or "Frankfurter" in cat:
+            drop_indices.append(i)
+
+        #Remove items based on Main food description
+        elif "reconstituted" in des or "evaporated" in des or "flavor" in des or "parfait" in des:
+            drop_indices.append(i)
+        elif "imitation" in des or "topping" in des or "sugar free" in des or "beverage" in des:
+            drop_indices.append(i)
+        elif "blend" in des or "lowfat" in des or "reduced" in des or "fat free" in des:
+            drop_indices.append(i)
+        elif "low fat" in des or "light" in des or "spread" in des or "dessert" in des:
+            drop_indices.append(i)
+        elif "processed" in des or "with" in des or "pressurized" in des or "Imitation" in des:
+            drop_indices.append(i)
+        elif "pickled" in des or "baked" in des or "nonfat" in des or "NS as to" in des:
+            drop_indices.append(i)
+        elif "roasted" in des or "rotisserie" in des or "stewed" in des or "fried" in des:
+            drop_indices.append(i)
+        elif "grilled" in des or "Spam" in des or "packaged" in des or "cooked" in des:
+            drop_indices.append(i)
+        elif "steamed" in des or "smoked" in des or "cooked" in des or "mixed" in des:
+            drop_indices.append(i)
+        elif "fat added" in des or "pie" in des or "no meat" in des or "stew" in des:
+            drop_indices.append(i)
+        elif "pasta" in des or "Pasta" in des or "lower" in des or "fortified" in des:
+            drop_indices.append(i)
+        elif "juice" in des or "syrup" in des or "Cereal" in des or "Cream of" in des:
+            drop_indices.append(i)
+        elif "Sauce" in des or "ingredient" in des or "enhanced" in des or "diet" in des:
+            drop_indices.append(i)
+        elif "Wine" in des or "drink" in des or "mix" in des or "instant" in des:
+            drop_indices.append(i)
+        elif "Iced" in des or "Cappuccino" in des or "cafe " in des or "sauce" in des:
+            drop_indices.append(i)
+        elif "tub" in des or "drippings" in des or "Fritter" in des or "Stuffed " in des:
+            drop_indices.append(i)
+        elif "creamed" in des or "bottled" in des or "bubble" in des or "substitute" in des:
+            drop_indices.append(i)
+        elif "Latte" in des or "Mocha" in des or "brew" in des or "powder" in des:
+            drop_indices.append(i)
+        elif "macchiato" in des or "Cuban" in des or "Sugar, cinnamon" in des or "confectioner" in des:
+            drop_indices.append(i)
+        elif "Sun-dried" in des or "Mix" in des or "Table fat, NFS" in des or "Honey butter" in des:
+            drop_indices.append(i)
+        elif "chocolate" in des or "bread" in des or "boil" in des or "candied" in des:
+            drop_indices.append(i)
+        elif "Dal" in des or "jelly" in des or "Congee" in des or "cocktail" in des:
+            drop_indices.append(i)
+        elif "Bacon bits" in des or "restaurant" in des or "frank" in des or "Wasabi peas" in des:
+            drop_indices.append(i)
+        elif "Shrimp scampi" in des or "vegetarian" in des or "baked" in des or "Baked" in des:
+            drop_indices.append(i)
+        elif "Fried" in des or "nugget" in des or "Duck, pressed, Chinese" in des or "pot roast" in des:
+            drop_indices.append(i)
+        elif "coated" in des or "cracklings" in des or "saute" in des or "other sources" in des:
+            drop_indices.append(i)
+        elif "Soy nut" in des or "NFS" in des or "and" in des or "sandwich" in des:
+            drop_indices.append(i)
+        elif "maraschino" in des or "Tahini" in des or " butter" in des or " salted" in des:
+            drop_indices.append(i)
+        elif "canned" in des or "decaffeinated" in des or "from frozen" in des or "casserole" in des:
+            drop_indices.append(i)
+        elif "Liver, paste or pate" in des or "Pork skin rinds" in des or "patty" in des or "Cream, whipped" in des:
+            drop_indices.append(i)
+        elif "Fish, stick" in des or "white only" in des or "yolk only" in des or "Almond paste" in des:
+            drop_indices.append(i)
+        elif "salad" in des or "Broccoli raab" in des or "lactose free" in des or "Fufu" in des:
+            drop_indices.append(i)
+        elif ", fruit" in des:
+            drop_indices.append(i)
+    return drop_indices
+
+
+@pytest.fixture(scope="module")
+def fixed():
+    return _fix_columns(_read_raw(FNDDS_CSV))
+
+
+def test_apply_rules_matches_legacy_loop(fixed):
+    expected = fixed.drop(legacy_drop_indices(fixed))
+    cleaned = apply_rules(fixed)
+    assert len(cleaned) == 269
+    pd.testing.assert_index_equal(cleaned.index, expected.index)
+    pd.testing.assert_frame_equal(cleaned, expected)
@@ -0,0 +1,58 @@
+"""Typo-tolerant food search, and the edit-distance check behind it."""
+
+import random
+
+import pytest
+
+from core.dataset import FNDDS_CSV, build_dataset
+from core.search import _bitmasks, _within
+
+
+def _levenshtein(a, b):
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def test_within_matches_dynamic_programming():
+    rng = random.Random(0)
+    for _ in range(5000):
+        a = "".join(rng.choice("abc") for _ in range(rng.randint(1, 9)))
+        b = "".join(rng.choice("abc") for _ in range(rng.randint(0, 9)))
+        distance = _levenshtein(a, b)
+        for limit in (0, 1, 2):
+            assert _within(a, _bitmasks(a), b, limit) == (distance <= limit), (a, b, limit)
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    if not FNDDS_CSV.exists():
+        pytest.skip("FNDDS CSV not available")
+    return build_dataset(FNDDS_CSV)
+
+
+def _descriptions(dataset, text, limit=3):
+    rows = dataset.search["raw"].search(dataset.raw, text, limit)
+    return rows["Main food description"].tolist()
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("brazl nut", "Brazil nuts"),
+    ("chiken brest", "Chicken breast"),
+    ("cheddar chees", "Cheese, Cheddar"),
+])
+def test_typos_find_the_food(dataset, text, expected):
+    assert _descriptions(dataset, text)[0].startswith(expected)
+
+
+def test_every_token_must_match_when_some_row_matches_all(dataset):
+    for description in _descriptions(dataset, "chicken breast", limit=None):
+        assert "chicken" in description.lower() and "breast" in description.lower()
+
+
+def test_empty_query_matches_nothing(dataset):
+    assert _descriptions(dataset, " ,.") == []
@@ -0,0 +1,58 @@
+"""Nearest-neighbour queries against a brute-force distance sort."""
+
+import numpy as np
+import pytest
+
+from core.dataset import FNDDS_CSV, build_dataset
+from core.similarity import BASES, SCALINGS, SimilarityIndex
+
+pytestmark = pytest.mark.skipif(not FNDDS_CSV.exists(), reason="FNDDS CSV not available")
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    return build_dataset(FNDDS_CSV)
+
+
+def _brute_force(x, position):
+    """Squared distances from row ``position`` to every other row, in float64."""
+    x = x.astype(np.float64)
+    d2 = ((x - x[position]) ** 2).sum(axis=1)
+    d2[position] = np.inf
+    return d2
+
+
+@pytest.mark.parametrize("scope", ["cleaned", "raw"])
+@pytest.mark.parametrize("basis", list(BASES))
+@pytest.mark.parametrize("scaling", list(SCALINGS))
+def test_neighbours_match_brute_force(dataset, scope, basis, scaling):
+    index = dataset.similarity[scope]
+    x, norms = index._matrices[basis, scaling]
+    positions = np.random.default_rng(0).choice(index.size, 20, replace=False)
+    nearest, distances = index.neighbours(positions, 10, basis, scaling)
+    assert nearest.shape == distances.shape == (len(positions), 10)
+    for position, found, found_d in zip(positions, nearest, distances):
+        expected = np.sort(_brute_force(x, position))[:10]
+        assert position not in found
+        # The index expands |a - b|^2 in float32, which loses about eps32
+        # times the squared norms; near-ties may then come back in either
+        # order, so compare squared distances rather than rows
+        atol = 8 * np.finfo(np.float32).eps * (norms[position] + norms.max())
+        np.testing.assert_allclose(found_d.astype(np.float64) ** 2, expected, rtol=1e-4, atol=atol)
+        assert (_brute_force(x, position)[found] <= expected[-1] + atol).all()
+        assert (np.diff(found_d) >= 0).all()
+
+
+def test_k_is_capped_at_the_other_rows(dataset):
+    frame = dataset.cleaned.iloc[:4]
+    nearest, distances = SimilarityIndex(frame).neighbours([0, 3], k=10)
+    assert nearest.shape == distances.shape == (2, 3)
+    assert 0 not in nearest[0] and 3 not in nearest[1]
+
+
+def test_single_row_has_no_neighbours(dataset):
+    frame = dataset.cleaned.iloc[:1]
+    index = SimilarityIndex(frame)
+    nearest, distances = index.neighbours([0], k=5)
+    assert nearest.shape == distances.shape == (1, 0)
+    assert index.similar(frame, 0, k=5).empty
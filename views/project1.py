@@ -1,267 +1,236 @@
 import streamlit as st
-import pandas as pd
 
-st.title("Nutrition Tool", anchor=False)
-
-st.write("Python Code for this project: https://github.com/ChristiannaLindsay/streamlit_website/blob/main/views/project1.py")
-
-
-# Project overview
-st.write(
-    """
-As someone who has always been interested in nutrition, I built a simple tool to help
-visualize what foods are highest in certain nutrients. I want someone to be able to choose what
-macronutrient, micronutrient, or mineral they are interested in (e.g. protein, magnesium, etc.),
-and learn what foods contain the highest densities of that nutrient.
-I am only
-interested in raw, whole (single-ingredient) foods, rather than processed, prepared, or fortified foods.
-All code for this project can be found on my GitHub.
-"""
+from core.daily_values import DEFAULT_PROFILE, PROFILES
+from core.dataset import load_nutrients
+from core.export import download_buttons
+from core.instrument import admin_panel, count, stage
+from core.memory import account, begin_run, end_run
+from core.prerender import static_section
+from core.query import Predicate
+from core.releases import available_releases, load_releases
+from core.similarity import BASES, SCALINGS
+from core.tables import for_display, paged_table, window
+
+count("nutrition_tool_runs")
+begin_run()
+
+with static_section(__file__, "intro") as cached:
+    if not cached:
+        st.title("Nutrition Tool", anchor=False)
+
+        st.write("Python Code for this project: https://github.com/ChristiannaLindsay/streamlit_website/blob/main/views/project1.py")
+
+
+        # Project overview
+        st.write(
+            """
+        As someone who has always been interested in nutrition, I built a simple tool to help
+        visualize what foods are highest in certain nutrients. I want someone to be able to choose what
+        macronutrient, micronutrient, or mineral they are interested in (e.g. protein, magnesium, etc.),
+        and learn what foods contain the highest densities of that nutrient.
+        I am only
+        interested in raw, whole (single-ingredient) foods, rather than processed, prepared, or fortified foods.
+        All code for this project can be found on my GitHub.
+        """
+        )
+
+        # Data set description
+        st.subheader("Data Set Description", anchor=False)
+        st.write(
+            """
+            I am using the
+            "FNDDS Nutrient Values.xlsx" data from the United States Department of Agriculture's Food and
+            Nutrient Database for Dietary Studies (https://www.ars.usda.gov/northeast-area/beltsville-md-bhnrc/beltsville-human-nutrition-research-center/food-surveys-research-group/docs/fndds-download-databases/).
+            This dataset contains micronutrient and macronutrient amounts per 100g of various foods,
+            including whole foods
+            (e.g. carrots), generic foods (e.g. chocolate milk), and branded items (e.g. Kellogg cereal).
+            Each food is identified by a unique eight-digit 'Food code' and is also described by 
+            a 'Main food description' a WWEIA Category Description,
+            and a four-digit 'WWEIA Category number.'
+            This is what the dataset looks like:
+        """
+        )
+
+# Parsed, cleaned and %DV-augmented once per process, shared by all sessions
+data = load_nutrients()
+# Only the visible page is sent to the browser
+with stage("render_raw_table"):
+    account("raw_page", paged_table(data.raw, key="raw", search_index=data.search["raw"]))
+
+with static_section(__file__, "cleaning") as cached:
+    if not cached:
+        # Data cleaning
+        st.subheader("Data Cleaning", anchor=False)
+
+
+        st.markdown("""
+        <style>
+        .big-font {font-size:20px !important;}
+        </style>
+        """, unsafe_allow_html=True)
+        st.markdown('<p class="big-font">Remove Unwanted Entries</p>', unsafe_allow_html=True)
+
+
+        st.write(
+            """
+            The main data cleaning task is to remove the unwanted foods
+            from the original list of 5624 items.
+            I will use three steps to remove the unwanted food items.
+
+            1. Use the first two digits of the WWEIA Category number
+            to remove the following food categories:
+
+            - Milk desserts and sauces = 13
+            - Frozen meals, soups, gravies = 28
+            - Egg mixture = 32 
+            - Egg substitutes = 33 
+            - Yeast breads, rolls = 51 
+            - Quick breads = 52 
+            - Cakes, cookies, pies, pastries, bars = 53 
+            - Crackers, snack products = 54 
+            - Pancakes, waffles, French toast, other grain products = 55 
+            - Grain mixtures, frozen meals, soups = 58 
+            - Meat substitutes = 59 
+            - Fruits and juices baby food = 67 
+            - Vegetables with meat, poultry, fish = 77 
+            - Mixtures mostly vegetables without meat, poultry, fish = 78 
+            - Salad dressings = 83 
+            - 'For use' with a sandwich or vegetable = 89 
+            - Formulated nutrition beverages, energy drinks, sports drinks = 95 
+
+            2. Remove foods with a WWEIA Category description containing certain words
+            (e.g. 'sandwich', 'fried', 'Formula').
+
+            3. Remove the remaining unwanted items based on their Main food description.
+            """
+            )
+
+        st.markdown("""
+        <style>
+        .big-font {font-size:20px !important;}
+        </style>
+        """, unsafe_allow_html=True)
+        st.markdown('<p class="big-font">Calculate Nutrient %DV</p>', unsafe_allow_html=True)
+
+        st.write("""
+            We also want to calculate the Percent Daily Value (%DV),
+            which is the percentage of the recommended Daily Value for each nutrient in a serving of food.
+            The FDA's website is used as a reference for the %DV's (https://www.fda.gov/food/nutrition-facts-label/daily-value-nutrition-and-supplement-facts-labels).
+            Note that some nutrients do not have defined Daily Values.
+
+            Here is what the cleaned data set looks like. With the extraneous items removed, the data set is reduced from 5624 entries to 269 entries.
+             """)
+
+# All profiles are precomputed, so switching only swaps the %DV block
+profile = st.selectbox(
+    "Daily Value profile:",
+    list(PROFILES),
+    index=list(PROFILES).index(DEFAULT_PROFILE),
+    format_func=PROFILES.get,
 )
+nutrients = data.for_profile(profile)
 
-# Data set description
-st.subheader("Data Set Description", anchor=False)
+# Show cleaned data frame
+with stage("render_cleaned_table"):
+    account("cleaned_page", paged_table(
+        nutrients,
+        key="cleaned",
+        default_columns=["Main food description", "WWEIA Category description", "Energy (kcal)",
+                         "Protein (g)", "Carbohydrate (g)", "Total Fat (g)", "Protein PDV"],
+        search_index=data.search["cleaned"],
+        export_name=f"fndds_cleaned_{profile}",
+        export_version=(data.sha256, profile),
+    ))
+
+# Food search
+st.subheader("Food Search", anchor=False)
 st.write(
     """
-    I am using the
-    "FNDDS Nutrient Values.xlsx" data from the United States Department of Agriculture's Food and
-    Nutrient Database for Dietary Studies (https://www.ars.usda.gov/northeast-area/beltsville-md-bhnrc/beltsville-human-nutrition-research-center/food-surveys-research-group/docs/fndds-download-databases/).
-    This dataset contains micronutrient and macronutrient amounts per 100g of various foods,
-    including whole foods
-    (e.g. carrots), generic foods (e.g. chocolate milk), and branded items (e.g. Kellogg cereal).
-    Each food is identified by a unique eight-digit 'Food code' and is also described by 
-    a 'Main food description' a WWEIA Category Description,
-    and a four-digit 'WWEIA Category number.'
-    This is what the dataset looks like:
-"""
+    Look up a particular food by name or category. Typos and partial words are fine
+    (e.g. 'brazl nut' or 'spin').
+    """
+)
+c1, c2 = st.columns([2, 1])
+query = c1.text_input("Food:", key="food_search")
+scope = c2.radio("Search in:", ["Cleaned foods", "All foods"], horizontal=True, key="food_search_scope")
+if query:
+    with stage("food_search"):
+        if scope == "Cleaned foods":
+            found = data.search["cleaned"].search(nutrients, query, limit=20)
+        else:
+            found = data.search["raw"].search(data.raw, query, limit=20)
+    if len(found):
+        st.dataframe(account("search_results", for_display(found)), hide_index=True)
+    else:
+        st.write("No matching foods.")
+
+# Multi-nutrient filters (controls live in the sidebar)
+engine = data.query[profile]
+st.sidebar.header("Nutrient Filters", anchor=False)
+filter_columns = st.sidebar.multiselect("Filter on:", engine.columns, key="filter_columns")
+predicates = []
+for col in filter_columns:
+    low, high = engine.bounds(col)
+    if high <= low:
+        st.sidebar.caption(f"{col}: every food has {low:g}")
+        continue
+    # Keyed by profile too, since %DV bounds change with the profile
+    chosen = st.sidebar.slider(col, low, high, (low, high), key=f"filter_{profile}_{col}")
+    if chosen != (low, high):
+        predicates.append(Predicate(col, "between", chosen))
+excluded = st.sidebar.multiselect(
+    "Exclude food groups (food code prefix):",
+    list(engine.prefix_labels),
+    format_func=lambda p: f"{p} - {engine.prefix_labels[p]}",
+    key="filter_exclude",
 )
 
-nutrients = pd.read_csv("./assets/FNDDS Nutrient Values.csv", skiprows=[0])
-st.dataframe(nutrients)
-
-# Data cleaning
-st.subheader("Data Cleaning", anchor=False)
-
-
-st.markdown("""
-<style>
-.big-font {font-size:20px !important;}
-</style>
-""", unsafe_allow_html=True)
-st.markdown('<p class="big-font">Remove Unwanted Entries</p>', unsafe_allow_html=True)
-
+if predicates or excluded:
+    st.subheader("Filtered Foods", anchor=False)
+    with stage("nutrient_filter"):
+        # Cached, read-only row positions; only the shown rows are copied out
+        matched = engine.evaluate(tuple(predicates), tuple(excluded))
+    st.caption(f"{len(matched)} of {len(nutrients)} foods match the sidebar filters")
+    st.dataframe(
+        account("filtered", for_display(
+            nutrients.iloc[matched[:100]][["Main food description", *filter_columns]]
+        )),
+        hide_index=True,
+    )
+    download_buttons(nutrients, matched, nutrients.columns, f"fndds_filtered_{profile}",
+                     (data.sha256, profile), key="filtered")
 
+# Similar foods
+st.subheader("Similar Foods", anchor=False)
 st.write(
     """
-    The main data cleaning task is to remove the unwanted foods
-    from the original list of 5624 items.
-    I will use three steps to remove the unwanted food items.
-
-    1. Use the first two digits of the WWEIA Category number
-    to remove the following food categories:
-    
-    - Milk desserts and sauces = 13
-    - Frozen meals, soups, gravies = 28
-    - Egg mixture = 32 
-    - Egg substitutes = 33 
-    - Yeast breads, rolls = 51 
-    - Quick breads = 52 
-    - Cakes, cookies, pies, pastries, bars = 53 
-    - Crackers, snack products = 54 
-    - Pancakes, waffles, French toast, other grain products = 55 
-    - Grain mixtures, frozen meals, soups = 58 
-    - Meat substitutes = 59 
-    - Fruits and juices baby food = 67 
-    - Vegetables with meat, poultry, fish = 77 
-    - Mixtures mostly vegetables without meat, poultry, fish = 78 
-    - Salad dressings = 83 
-    - 'For use' with a sandwich or vegetable = 89 
-    - Formulated nutrition beverages, energy drinks, sports drinks = 95 
-
-    2. Remove foods with a WWEIA Category description containing certain words
-    (e.g. 'sandwich', 'fried', 'Formula').
-
-    3. Remove the remaining unwanted items based on their Main food description.
+    Pick a food to find the foods with the most similar nutrient profile, comparing
+    either amounts per 100g or per calorie, with each nutrient z-scored or scaled to its %DV.
     """
-    )
-
-st.markdown("""
-<style>
-.big-font {font-size:20px !important;}
-</style>
-""", unsafe_allow_html=True)
-st.markdown('<p class="big-font">Calculate Nutrient %DV</p>', unsafe_allow_html=True)
-
-st.write("""
-    We also want to calculate the Percent Daily Value (%DV),
-    which is the percentage of the recommended Daily Value for each nutrient in a serving of food.
-    The FDA's website is used as a reference for the %DV's (https://www.fda.gov/food/nutrition-facts-label/daily-value-nutrition-and-supplement-facts-labels).
-    Note that some nutrients do not have defined Daily Values.
-
-    Here is what the cleaned data set looks like. With the extraneous items removed, the data set is reduced from 5624 entries to 269 entries.
-     """)
-
-### Clean data
-
-## Fix column names
-newcols = []
-for col in nutrients.columns:
-    splitcol = col.split("\n")
-    cleancol = " ".join(splitcol)
-    newcols.append(cleancol)
-nutrients.columns = newcols
-
-## Remove items
-drop_indices = []
-for i in range(nutrients.shape[0]): #row indices
-    
-    code = nutrients["Food code"][i] #Food code
-    cat = nutrients["WWEIA Category description"][i] #Food category
-    des = nutrients["Main food description"][i]
-    
-    #Remove items based on food code
-    if int(str(code)[:2]) in [13,28,32,33,51,52,53,54,55,58,59,67,77,78,83,89,95]:
-        drop_indices.append(i)
-    
-    #Remove items based on Food category
-    elif "substitutes" in cat or "sauces" in cat or "desserts" in cat:
-        drop_indices.append(i)
-    elif "Smoothies" in cat or "Formula" in cat or "Flavored" in cat:
-        drop_indices.append(i)
-    elif "shakes" in cat or "Pizza" in cat or "sandwich" in cat:
-        drop_indices.append(i)
-    elif "Baby" in cat or "Mix" in cat or "mix" in cat:
-        drop_indices.append(i)
-    elif "patties" in cat or "dinner" in cat or "sauce" in cat:
-        drop_indices.append(i)
-    elif "Burger" in cat or "Soup" in cat or "Processed" in cat:
-        drop_indices.append(i)
-    elif "Fried" in cat or "chip" in cat or "condiment" in cat:
-        drop_indices.append(i) 
-    elif "combination" in cat or "juice" in cat or "Margarine" in cat:
-        drop_indices.append(i)
-    elif "dressing" in cat or "topping" in cat or "sorbet" in cat:
-        drop_indices.append(i)
-    elif "Candy" in cat or "soft drink" in cat or "diet" in cat:
-        drop_indices.append(i)
-    elif "fried" in cat or "baked" in cat or "Pudding" in cat:
-        drop_indices.append(i)
-    elif "Liquor" in cat or "Wine" in cat or "Beer" in cat:
-        drop_indices.append(i)    
-    elif "Soft drinks" in cat or "Pickle" in cat or "pickle" in cat:
-        drop_indices.append(i)
-    elif "dish" in cat or "Dried fruit" in cat or "Pasta" in cat:
-        drop_indices.append(i)
-    elif "Cracker" in cat or "cured" in cat or "Sausages" in cat:
-        drop_indices.append(i)
-    elif "Coleslaw" in cat or "Fruit drinks" in cat or "creamed" in cat:
-        drop_indices.append(i)
-    elif "Oatmeal" in cat or "cereal" in cat or "Frankfurter" in cat:
-        drop_indices.append(i)
-        
-    #Remove items based on Main food description
-    elif "reconstituted" in des or "evaporated" in des or "flavor" in des or "parfait" in des:
-        drop_indices.append(i)
-    elif "imitation" in des or "topping" in des or "sugar free" in des or "beverage" in des:
-        drop_indices.append(i)     
-    elif "blend" in des or "lowfat" in des or "reduced" in des or "fat free" in des:
-        drop_indices.append(i)
-    elif "low fat" in des or "light" in des or "spread" in des or "dessert" in des:
-        drop_indices.append(i)
-    elif "processed" in des or "with" in des or "pressurized" in des or "Imitation" in des:
-        drop_indices.append(i)
-    elif "pickled" in des or "baked" in des or "nonfat" in des or "NS as to" in des:
-        drop_indices.append(i)
-    elif "roasted" in des or "rotisserie" in des or "stewed" in des or "fried" in des:
-        drop_indices.append(i)
-    elif "grilled" in des or "Spam" in des or "packaged" in des or "cooked" in des:
-        drop_indices.append(i)
-    elif "steamed" in des or "smoked" in des or "cooked" in des or "mixed" in des:
-        drop_indices.append(i)
-    elif "fat added" in des or "pie" in des or "no meat" in des or "stew" in des:
-        drop_indices.append(i)
-    elif "pasta" in des or "Pasta" in des or "lower" in des or "fortified" in des:
-        drop_indices.append(i)
-    elif "juice" in des or "syrup" in des or "Cereal" in des or "Cream of" in des:
-        drop_indices.append(i)
-    elif "Sauce" in des or "ingredient" in des or "enhanced" in des or "diet" in des:
-        drop_indices.append(i)
-    elif "Wine" in des or "drink" in des or "mix" in des or "instant" in des:
-        drop_indices.append(i)
-    elif "Iced" in des or "Cappuccino" in des or "cafe " in des or "sauce" in des:
-        drop_indices.append(i)
-    elif "tub" in des or "drippings" in des or "Fritter" in des or "Stuffed " in des:
-        drop_indices.append(i)
-    elif "creamed" in des or "bottled" in des or "bubble" in des or "substitute" in des:
-        drop_indices.append(i)
-    elif "Latte" in des or "Mocha" in des or "brew" in des or "powder" in des:
-        drop_indices.append(i)
-    elif "macchiato" in des or "Cuban" in des or "Sugar, cinnamon" in des or "confectioner" in des:
-        drop_indices.append(i)      
-    elif "Sun-dried" in des or "Mix" in des or "Table fat, NFS" in des or "Honey butter" in des:
-        drop_indices.append(i)
-    elif "chocolate" in des or "bread" in des or "boil" in des or "candied" in des:
-        drop_indices.append(i)
-    elif "Dal" in des or "jelly" in des or "Congee" in des or "cocktail" in des:
-        drop_indices.append(i)
-    elif "Bacon bits" in des or "restaurant" in des or "frank" in des or "Wasabi peas" in des:
-        drop_indices.append(i)        
-    elif "Shrimp scampi" in des or "vegetarian" in des or "baked" in des or "Baked" in des:
-        drop_indices.append(i)
-    elif "Fried" in des or "nugget" in des or "Duck, pressed, Chinese" in des or "pot roast" in des:
-        drop_indices.append(i)
-    elif "coated" in des or "cracklings" in des or "saute" in des or "other sources" in des:
-        drop_indices.append(i) 
-    elif "Soy nut" in des or "NFS" in des or "and" in des or "sandwich" in des:
-        drop_indices.append(i)    
-    elif "maraschino" in des or "Tahini" in des or " butter" in des or " salted" in des:
-        drop_indices.append(i) 
-    elif "canned" in des or "decaffeinated" in des or "from frozen" in des or "casserole" in des:
-        drop_indices.append(i)       
-    elif "Liver, paste or pate" in des or "Pork skin rinds" in des or "patty" in des or "Cream, whipped" in des:
-        drop_indices.append(i) 
-    elif "Fish, stick" in des or "white only" in des or "yolk only" in des or "Almond paste" in des:
-        drop_indices.append(i)
-    elif "salad" in des or "Broccoli raab" in des or "lactose free" in des or "Fufu" in des:
-        drop_indices.append(i)  
-    elif ", fruit" in des:
-        drop_indices.append(i)
-
-nutrients = nutrients.drop(drop_indices)
-
-# Define PDV function
-def PDV(amount, DV):
-    return((amount/DV)*100)
-
-# Define %DVs
-nutrients['Protein PDV'] = PDV(amount=nutrients['Protein (g)'], DV=50)
-nutrients['Carbohydrate PDV'] = PDV(amount=nutrients['Carbohydrate (g)'], DV=275)
-nutrients['Total Fat PDV'] = PDV(amount=nutrients['Total Fat (g)'], DV=78)
-nutrients['Cholesterol PDV'] = PDV(amount=nutrients['Cholesterol (mg)'], DV=300)
-nutrients['Vitamin A, RAE PDV'] = PDV(amount=nutrients['Vitamin A, RAE (mcg_RAE)'], DV=900)
-nutrients['Thiamin PDV'] = PDV(amount=nutrients['Thiamin (mg)'], DV=1.2)
-nutrients['Riboflavin PDV'] = PDV(amount=nutrients['Riboflavin (mg)'], DV=1.3)
-nutrients['Vitamin B-6 PDV'] = PDV(amount=nutrients['Vitamin B-6 (mg)'], DV=1.7)
-nutrients['Folate, DFE PDV'] = PDV(amount=nutrients['Folate, DFE (mcg_DFE)'], DV=400)
-nutrients['Choline, total PDV'] = PDV(amount=nutrients['Choline, total (mg)'], DV=550)
-nutrients['Vitamin B-12 PDV'] = PDV(amount=nutrients['Vitamin B-12 (mcg)'], DV=2.4)
-nutrients['Vitamin C PDV'] = PDV(amount=nutrients['Vitamin C (mg)'], DV=90)
-nutrients['Vitamin D (D2 + D3) PDV'] = PDV(amount=nutrients['Vitamin D (D2 + D3) (mcg)'], DV=20)
-nutrients['Vitamin E (alpha-tocopherol) PDV'] = PDV(amount=nutrients['Vitamin E (alpha-tocopherol) (mg)'], DV=15)
-nutrients['Vitamin K (phylloquinone) PDV'] = PDV(amount=nutrients['Vitamin K (phylloquinone) (mcg)'], DV=120)
-nutrients['Calcium PDV'] = PDV(amount=nutrients['Calcium (mg)'], DV=1300)
-nutrients['Phosphorus PDV'] = PDV(amount=nutrients['Phosphorus (mg)'], DV=1250)
-nutrients['Magnesium PDV'] = PDV(amount=nutrients['Magnesium (mg)'], DV=420)
-#nutrients['Iron PDV'] = PDV(amount=nutrients['Iron (mg)'], DV=18)
-#nutrients['Zinc PDV'] = PDV(amount=nutrients['Zinc (mg)'], DV=11)
-nutrients['Copper PDV'] = PDV(amount=nutrients['Copper (mg)'], DV=0.9)
-nutrients['Selenium PDV'] = PDV(amount=nutrients['Selenium (mcg)'], DV=55)
-nutrients['Potassium PDV'] = PDV(amount=nutrients['Potassium (mg)'], DV=4700)
-nutrients['Sodium PDV'] = PDV(amount=nutrients['Sodium (mg)'], DV=2300)
-
-        
-# Show cleaned data frame
-st.dataframe(nutrients)
+)
+descriptions = account("food_options", nutrients["Main food description"].astype(str).to_numpy())
+c1, c2 = st.columns([2, 1])
+food = c1.selectbox("Food:", range(len(nutrients)), format_func=lambda i: descriptions[i],
+                    key="similar_food")
+K = c2.number_input("Number of similar foods:", min_value=1, max_value=20, value=5, step=1)
+c1, c2, c3 = st.columns(3)
+basis = c1.radio("Compare:", list(BASES), format_func=BASES.get, key="similar_basis")
+scaling = c2.radio("Scale nutrients:", list(SCALINGS), format_func=SCALINGS.get, key="similar_scaling")
+similar_scope = c3.radio("Among:", ["Cleaned foods", "All foods"], key="similar_scope")
+with stage("similar_foods"):
+    if similar_scope == "Cleaned foods":
+        similar = data.similarity["cleaned"].similar(nutrients, food, K, basis, scaling)
+    else:
+        # Rows are positions in the raw table, which the cleaned table was filtered from
+        raw_position = data.raw.index.get_loc(nutrients.index[food])
+        similar = data.similarity["raw"].similar(data.raw, raw_position, K, basis, scaling)
+        similar.columns = [" ".join(str(col).split("\n")) for col in similar.columns]
+st.dataframe(
+    account("similar", for_display(
+        similar[["Main food description", "WWEIA Category description", "Distance"]]
+    )),
+    hide_index=True,
+)
 
 # Visualize data
 st.subheader("Interactive Nutrient Tool", anchor=False)
@@ -279,15 +248,66 @@ st.write(
 """
 )
 
-just_nut = nutrients.drop(['Food code', 'WWEIA Category number', 'WWEIA Category description'],axis=1)
-
 # Choose nutrient to plot top N foods for
-
-nutrient_choice = st.selectbox("Nutrient:", just_nut.columns[1:])
+# (the rankings cover every nutrient column, in table order)
+nutrient_choice = st.selectbox("Nutrient:", data.rankings.columns)
 N = st.number_input('Number of foods:', min_value=1, max_value=10, value=5, step=1)
-topNfoods = just_nut.sort_values(nutrient_choice, ascending=False).iloc[:N]
-st.dataframe(topNfoods)
-
-st.bar_chart(topNfoods, x='Main food description', y=nutrient_choice, color='#d5b9d5')
+c1, c2 = st.columns(2)
+rank = c1.selectbox("Show foods:", ["Highest", "Lowest"])
+basis = c2.selectbox("Rank by amount:", ["Per 100 g", "Per kcal"])
+if basis == "Per kcal":
+    st.caption(f"Ranked by {nutrient_choice} per kcal; amounts are shown per 100 g.")
+# %DV is a positive rescaling, so the rankings hold for every profile; the
+# positions are a view of the shared order, and only the N shown rows are copied
+with stage("top_n"):
+    top = data.rankings.positions(nutrient_choice, N, ascending=rank == "Lowest",
+                                  per_kcal=basis == "Per kcal")
+    topNfoods = account("top_n", window(
+        nutrients, top, ["Main food description", *data.rankings.columns], page_size=N
+    ))
+with stage("render_top_n"):
+    st.dataframe(topNfoods)
+
+    # Altair reads a colon in a field name as a type suffix (e.g. "PUFA 20:5 n-3 (g)")
+    bar = nutrient_choice.replace(":", "\u2236")
+    chart = topNfoods[["Main food description", nutrient_choice]].rename(columns={nutrient_choice: bar})
+    st.bar_chart(chart, x='Main food description', y=bar, y_label=nutrient_choice, color='#d5b9d5')
+
+# Compare FNDDS releases
+st.subheader("Release Comparison", anchor=False)
+releases = available_releases()
+if len(releases) < 2:
+    st.write(
+        f"""
+        Only the {", ".join(releases)} FNDDS release is available, so there is nothing to compare yet.
+        Other releases show up here once their CSVs are added to the assets folder.
+        """
+    )
+else:
+    with stage("load_releases"):
+        release_set = load_releases()
+    c1, c2 = st.columns(2)
+    old_release = c1.selectbox("From release:", release_set.labels, index=0)
+    new_release = c2.selectbox("To release:", release_set.labels, index=len(release_set.labels) - 1)
+    if old_release != new_release:
+        added, removed, _ = release_set.diff(old_release, new_release)
+        changed = release_set.changed(old_release, new_release)
+        kept, dropped = release_set.cleaning(old_release, new_release)
+        st.write(
+            f"{len(added)} foods added, {len(removed)} removed and {len(changed)} changed. "
+            f"Of the foods in both releases, the cleaning rules now keep {len(kept)} "
+            f"they used to drop and drop {len(dropped)} they used to keep."
+        )
+        tab1, tab2, tab3, tab4 = st.tabs(["Added", "Removed", "Changed", "Cleaning"])
+        tab1.dataframe(for_display(added), hide_index=True)
+        tab2.dataframe(for_display(removed), hide_index=True)
+        tab3.dataframe(changed)
+        tab4.caption("Now kept by the cleaning rules")
+        tab4.dataframe(for_display(kept[["Food code", "Main food description"]]), hide_index=True)
+        tab4.caption("Now dropped by the cleaning rules")
+        tab4.dataframe(for_display(dropped[["Food code", "Main food description"]]), hide_index=True)
+
+end_run()
+admin_panel()
 
 